@@ -0,0 +1,102 @@
+from typing import Any, Dict, Optional
+from fastapi import Body, Depends, HTTPException, Request
+from supabase import AsyncClient
+from app.core.security import has_admin_token, passcode_matches
+from app.db.parties import get_party_row
+from app.db.repository import get_db
+from app.schemas.party import PartyAdminAction
+
+
+async def load_party(request: Request, supabase: AsyncClient, party_id: str, fresh: bool = False) -> Dict[str, Any]:
+    """
+    Returns the full `parties` row for this request, raising 404 if it does
+    not exist. The row is read once (through party_cache unless `fresh`)
+    and kept on request.state for anything else in the request that needs it.
+    """
+    party = getattr(request.state, "party", None)
+    if party is not None and party["id"] == party_id and not fresh:
+        return party
+
+    if fresh:
+        response = await supabase.table("parties").select("*").eq("id", party_id).execute()
+        party = response.data[0] if response.data else None
+    else:
+        party = await get_party_row(supabase, party_id)
+
+    if party is None:
+        raise HTTPException(status_code=404, detail="Party not found")
+
+    request.state.party = party
+    return party
+
+
+class PartyAccess:
+    """
+    Route dependency that loads the party from the {party_id} path and
+    applies the checks the route needs, in the same order everywhere:
+    404 (no party) -> 403 (not admin, see AdminAccess) -> 400 (wrong status).
+
+    - status: required party status (True = open, False = locked), with
+      `status_error` as the 400 detail
+    - fresh: read the row from the DB, bypassing party_cache; required when
+      `status` decides whether a write may happen (the cache can be stale)
+    """
+
+    def __init__(self, status: Optional[bool] = None, status_error: str = "", fresh: bool = False):
+        self.status = status
+        self.status_error = status_error
+        self.fresh = fresh
+
+    async def __call__(self, party_id: str, request: Request, supabase: AsyncClient = Depends(get_db)) -> Dict[str, Any]:
+        party = await load_party(request, supabase, party_id, fresh=self.fresh)
+        self.check_status(party)
+        return party
+
+    def check_status(self, party: Dict[str, Any]):
+        if self.status is not None and party["status"] != self.status:
+            raise HTTPException(status_code=400, detail=self.status_error)
+
+
+class AdminAccess(PartyAccess):
+    """
+    PartyAccess for admin routes: also requires an admin token
+    (Authorization: Bearer) or the `passcode` field of the JSON body.
+
+    The body is declared here as `body`, so a route whose own body model
+    carries the passcode names its parameter `body` too; FastAPI then reads
+    one body and validates it for both.
+
+    - need_row=False: the route only wants the admin check, so an admin
+      token lets it skip reading the party (it gets None instead)
+    - allow_token=False: only the passcode will do (e.g. to issue a token)
+    """
+
+    def __init__(self, status: Optional[bool] = None, status_error: str = "", fresh: bool = False, need_row: bool = True, allow_token: bool = True):
+        super().__init__(status, status_error, fresh)
+        self.need_row = need_row or status is not None or fresh
+        self.allow_token = allow_token
+
+    async def __call__(
+        self,
+        party_id: str,
+        request: Request,
+        body: PartyAdminAction = Body(default_factory=PartyAdminAction),
+        supabase: AsyncClient = Depends(get_db),
+    ) -> Optional[Dict[str, Any]]:
+        token_ok = self.allow_token and has_admin_token(request, party_id)
+        if token_ok and not self.need_row:
+            return getattr(request.state, "party", None)
+
+        party = await load_party(request, supabase, party_id, fresh=self.fresh)
+
+        if not token_ok and not passcode_matches(party, body.passcode):
+            raise HTTPException(status_code=403, detail="Invalid passcode")
+
+        self.check_status(party)
+        return party
+
+
+# Common guards
+party_exists = PartyAccess()
+party_admin = AdminAccess()
+party_admin_only = AdminAccess(need_row=False)
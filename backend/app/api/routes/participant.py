@@ -1,67 +1,261 @@
-from fastapi import APIRouter, HTTPException, status
-from app.db.supabase import supabase
+import json
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from postgrest.exceptions import APIError
+from supabase import AsyncClient
+from app.db.repository import get_db
+from app.db.errors import IMPORT_ERRORS, JOIN_ERRORS, RPC_NOT_FOUND
+from app.db.participants import get_participant_page, iter_participant_pages, participant_list_etags
 from app.schemas.participant import (
     ParticipantJoin, 
     ParticipantPublic, 
     ParticipantPrivate, 
     ResendMyMatch,
-    ParticipantUpdate
+    ParticipantUpdate,
+    ParticipantImport,
+    ParticipantImportResponse,
 )
-from app.schemas.party import PartyAdminAction
+from app.core.config import settings
+from app.api.deps import AdminAccess, PartyAccess, load_party, party_admin_only, party_exists
+from app.db.bulk import chunked
 from app.utils.email import send_match_email
-from typing import List
+from app.utils.etag import etag_matches, make_etag
+from app.utils.live import hub
+from app.utils.participant_import import EXISTS, MAX_IMPORT_ROWS, check_rows, parse_csv
+from typing import List, Optional
 
 router = APIRouter(prefix="/api/party/{party_id}/participants", tags=["Participants"])
 
+# Largest ?limit= for one page of participants
+MAX_PAGE_SIZE = 1000
+
+NDJSON = "application/x-ndjson"
+
+# Route guards (see app.api.deps.PartyAccess). They allow a write based on
+# the party's status, so they read it from the DB rather than party_cache.
+party_open = PartyAccess(status=True, status_error=JOIN_ERRORS["55000"][1], fresh=True)
+party_admin_open = AdminAccess(status=True, status_error=JOIN_ERRORS["55000"][1], fresh=True)
+party_admin_removable = AdminAccess(status=True, status_error="Cannot remove participants from a locked party.", fresh=True)
+
 
 @router.get("", response_model=List[ParticipantPublic])
-def list_participants(party_id: str):
-    """List all participants in a party (names only)."""
-    
-    # Verify party exists
-    party_response = supabase.table("parties").select("id").eq("id", party_id).execute()
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
-    
-    response = supabase.table("participants").select("id, name").eq("party_id", party_id).execute()
-    
-    return response.data
+async def list_participants(
+    party_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[UUID] = None,
+    party: dict = Depends(party_exists),
+    supabase: AsyncClient = Depends(get_db),
+):
+    """
+    List all participants in a party (names only). Supports ?limit=&after=
+    paging and NDJSON streaming; the full list answers If-None-Match with 304.
+    """
+    
+    if limit is not None or after is not None or NDJSON in request.headers.get("accept", ""):
+        return await _participant_list(request, response, supabase, party_id, "id, name", limit, after)
+    
+    # Unchanged since this process last served the list: no DB call at all
+    if_none_match = request.headers.get("if-none-match")
+    known = participant_list_etags.get(party_id)
+    if known is not None and etag_matches(if_none_match, known):
+        return Response(status_code=304, headers={"ETag": known, "Cache-Control": "no-cache"})
+    
+    # A join landing while we read must not leave this (already stale) ETag cached
+    generation = participant_list_etags.generation()
+    participants = await _participant_list(request, response, supabase, party_id, "id, name", None, None)
+    etag = make_etag(participants)
+    participant_list_etags.set(party_id, etag, generation)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return participants
 
 
 @router.post("/admin", response_model=List[ParticipantPrivate])
-def list_participants_admin(party_id: str, auth: PartyAdminAction):
-    """List all participants with emails. Requires master passcode."""
-    
-    # Verify passcode
-    party_response = supabase.table("parties").select("passcode").eq("id", party_id).execute()
-    
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
-    
-    if party_response.data[0]["passcode"] != auth.passcode:
-        raise HTTPException(status_code=403, detail="Invalid passcode")
-        
-    response = supabase.table("participants").select("id, name, email").eq("party_id", party_id).execute()
-    return response.data
+async def list_participants_admin(
+    party_id: str,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[UUID] = None,
+    party: Optional[dict] = Depends(party_admin_only),
+    supabase: AsyncClient = Depends(get_db),
+):
+    """List all participants with emails. Requires master passcode or admin token. Paging and streaming as above."""
+    
+    return await _participant_list(request, response, supabase, party_id, "id, name, email", limit, after)
+
+
+async def _participant_list(request: Request, response: Response, supabase: AsyncClient, party_id: str, columns: str, limit: Optional[int], after: Optional[UUID]):
+    """
+    Builds a participant list response, ordered by id:
+    - `Accept: application/x-ndjson`: one JSON object per line, read from the
+      DB in DB_BATCH_SIZE pages while the response is sent (capped by ?limit=)
+    - ?limit=: one page; X-Next-Cursor holds the ?after= for the next one
+    - neither: the whole list, as before
+    """
+    cursor = str(after) if after is not None else None
+    
+    if NDJSON in request.headers.get("accept", ""):
+        pages = iter_participant_pages(supabase, party_id, columns, settings.DB_BATCH_SIZE, cursor, limit)
+        return StreamingResponse(_ndjson_lines(pages), media_type=NDJSON)
+    
+    if limit is None and cursor is None:
+        result = await supabase.table("participants").select(columns).eq("party_id", party_id).order("id").execute()
+        return result.data
+    
+    # Fetch one extra row to learn whether there is a next page
+    size = limit or MAX_PAGE_SIZE
+    rows = await get_participant_page(supabase, party_id, columns, size + 1, cursor)
+    if len(rows) > size:
+        rows = rows[:size]
+        response.headers["X-Next-Cursor"] = rows[-1]["id"]
+    return rows
+
+
+async def _ndjson_lines(pages):
+    async for page in pages:
+        yield "".join(json.dumps(row) + "\n" for row in page)
+
+
+@router.post("/import", response_model=ParticipantImportResponse)
+async def import_participants(party_id: str, body: ParticipantImport, party: dict = Depends(party_admin_open), supabase: AsyncClient = Depends(get_db)):
+    """Add many participants at once from a JSON list or CSV text. Requires master passcode or admin token."""
+    
+    # 1. Parse
+    if body.csv is not None:
+        try:
+            rows = parse_csv(body.csv)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        rows = [row.model_dump() for row in body.participants or []]
+    
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_IMPORT_ROWS} participants per import.")
+    
+    # 2. Validate and de-duplicate against the party's current emails (one query)
+    existing = await supabase.table("participants").select("email").eq("party_id", party_id).execute()
+    to_insert, report = check_rows(rows, {p["email"] for p in existing.data})
+    
+    # 3. Insert: open-party check and insert in one transaction; emails
+    #    registered meanwhile are skipped by the database
+    added = 0
+    try:
+        if to_insert:
+            added = await _insert_import(supabase, party_id, to_insert, report)
+    finally:
+        participant_list_etags.invalidate(party_id)
+    if added:
+        hub.publish(party_id, "participants_imported", {"added": added})
+    
+    return ParticipantImportResponse(added=added, skipped=len(report) - added, rows=report)
+
+
+async def _insert_import(supabase: AsyncClient, party_id: str, to_insert, report) -> int:
+    """Inserts the rows with one import_participants call; returns how many were added."""
+    try:
+        response = await supabase.rpc("import_participants", {
+            "p_party_id": party_id,
+            "p_participants": [{"name": row["name"], "email": row["email"]} for row in to_insert],
+        }).execute()
+    except APIError as e:
+        if e.code == RPC_NOT_FOUND:
+            # Database has not been migrated yet
+            return await _import_without_rpc(supabase, party_id, to_insert, report)
+        if e.code in IMPORT_ERRORS:
+            status_code, detail = IMPORT_ERRORS[e.code]
+            raise HTTPException(status_code=status_code, detail=detail)
+        raise
+    
+    inserted = {p["email"] for p in response.data}
+    for row in to_insert:
+        if row["email"] not in inserted:
+            report[row["row"] - 1]["status"] = EXISTS
+    return len(response.data)
+
+
+async def _import_without_rpc(supabase: AsyncClient, party_id: str, to_insert, report) -> int:
+    """
+    Fallback import for databases without the import_participants function:
+    batched inserts after the guard's fresh status check (not atomic).
+    """
+    added = 0
+    for batch in chunked(to_insert, settings.DB_BATCH_SIZE):
+        added += await _insert_import_batch(supabase, party_id, batch, report)
+    return added
+
+
+async def _insert_import_batch(supabase: AsyncClient, party_id: str, batch, report) -> int:
+    """Inserts one batch; rows someone else added meanwhile are reported as existing."""
+    remaining = batch
+    while remaining:
+        try:
+            await supabase.table("participants").insert(
+                [{"party_id": party_id, "name": row["name"], "email": row["email"]} for row in remaining]
+            ).execute()
+            return len(remaining)
+        except APIError as e:
+            if e.code != "23505":
+                raise
+            # A concurrent join took some of these emails; drop the taken ones and try again
+            taken = await supabase.table("participants").select("email").eq("party_id", party_id).execute()
+            taken_emails = {p["email"] for p in taken.data}
+            still_free = [row for row in remaining if row["email"] not in taken_emails]
+            if len(still_free) == len(remaining):
+                raise  # Not an email clash we can see
+            for row in remaining:
+                if row["email"] in taken_emails:
+                    report[row["row"] - 1]["status"] = EXISTS
+            remaining = still_free
+    return 0
 
 
 @router.post("", response_model=ParticipantPublic, status_code=status.HTTP_201_CREATED)
-def join_party(party_id: str, participant: ParticipantJoin):
+async def join_party(party_id: str, participant: ParticipantJoin, request: Request, supabase: AsyncClient = Depends(get_db)):
     """Join a party as a new participant."""
     
-    # Verify party exists and is open
-    party_response = supabase.table("parties").select("status").eq("id", party_id).execute()
+    # Open-party check and insert in one round trip; the (party_id, email)
+    # unique index rejects duplicates, even from simultaneous requests
+    try:
+        response = await supabase.rpc("join_party", {
+            "p_party_id": party_id,
+            "p_name": participant.name,
+            "p_email": participant.email,
+        }).execute()
+    except APIError as e:
+        if e.code == RPC_NOT_FOUND:
+            # Database has not been migrated yet
+            return await _join_without_rpc(request, supabase, party_id, participant)
+        if e.code in JOIN_ERRORS:
+            status_code, detail = JOIN_ERRORS[e.code]
+            raise HTTPException(status_code=status_code, detail=detail)
+        raise
+    
+    participant_list_etags.invalidate(party_id)
+    if not response.data:
+        raise HTTPException(status_code=500, detail="Failed to join party")
     
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
+    hub.publish(party_id, "participant_joined", {"id": response.data["id"], "name": response.data["name"]})
+    return response.data
+
+
+async def _join_without_rpc(request: Request, supabase: AsyncClient, party_id: str, participant: ParticipantJoin):
+    """Fallback join for databases without the join_party function."""
     
-    if not party_response.data[0]["status"]:  # Party is locked
-        raise HTTPException(status_code=400, detail="Party is locked. No new participants allowed.")
+    # Verify party exists and is open
+    await party_open(party_id, request, supabase)
     
-    # Check if email already registered
-    existing = supabase.table("participants").select("id").eq("party_id", party_id).eq("email", participant.email).execute()
+    # Check if email already registered (the unique index may not exist yet either)
+    existing = await supabase.table("participants").select("id").eq("party_id", party_id).eq("email", participant.email).execute()
     if existing.data:
-        raise HTTPException(status_code=400, detail="This email is already registered for this party.")
+        raise HTTPException(status_code=400, detail=JOIN_ERRORS["23505"][1])
     
     # Insert participant
     participant_data = {
@@ -70,107 +264,104 @@ def join_party(party_id: str, participant: ParticipantJoin):
         "email": participant.email,
     }
     
-    response = supabase.table("participants").insert(participant_data).execute()
+    response = await supabase.table("participants").insert(participant_data).execute()
+    participant_list_etags.invalidate(party_id)
     
     if not response.data:
         raise HTTPException(status_code=500, detail="Failed to join party")
     
-    return response.data[0]
+    joined = response.data[0]
+    hub.publish(party_id, "participant_joined", {"id": joined["id"], "name": joined["name"]})
+    return joined
 
 
 @router.patch("/{participant_id}", response_model=ParticipantPrivate)
-def update_participant(party_id: str, participant_id: str, update_data: ParticipantUpdate):
-    """Update a participant's details. Requires master passcode."""
-    
-    # Verify passcode
-    party_response = supabase.table("parties").select("passcode").eq("id", party_id).execute()
+async def update_participant(
+    party_id: str,
+    participant_id: str,
+    body: ParticipantUpdate,
+    party: Optional[dict] = Depends(party_admin_only),
+    supabase: AsyncClient = Depends(get_db),
+):
+    """Update a participant's details. Requires master passcode or admin token."""
     
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
-    
-    if party_response.data[0]["passcode"] != update_data.passcode:
-        raise HTTPException(status_code=403, detail="Invalid passcode")
-        
     # Prepare update data
     data_to_update = {}
-    if update_data.new_email:
-        data_to_update["email"] = update_data.new_email
-    if update_data.new_name:
-        data_to_update["name"] = update_data.new_name
+    if body.new_email:
+        data_to_update["email"] = body.new_email
+    if body.new_name:
+        data_to_update["name"] = body.new_name
         
     if not data_to_update:
         raise HTTPException(status_code=400, detail="No data to update")
         
     # Perform update
-    response = supabase.table("participants").update(data_to_update).eq("id", participant_id).eq("party_id", party_id).execute()
+    response = await supabase.table("participants").update(data_to_update).eq("id", participant_id).eq("party_id", party_id).execute()
+    participant_list_etags.invalidate(party_id)
     
     if not response.data:
         raise HTTPException(status_code=404, detail="Participant not found")
-        
-    return response.data[0]
+    
+    updated = response.data[0]
+    hub.publish(party_id, "participant_updated", {"id": updated["id"], "name": updated["name"]})
+    return updated
 
 
 @router.delete("/{participant_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_participant(party_id: str, participant_id: str, auth: PartyAdminAction):
-    """Remove a participant from the party. Requires master passcode."""
-    
-    # Verify passcode
-    party_response = supabase.table("parties").select("passcode, status").eq("id", party_id).execute()
-    
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
-    
-    if party_response.data[0]["passcode"] != auth.passcode:
-        raise HTTPException(status_code=403, detail="Invalid passcode")
-    
-    if not party_response.data[0]["status"]:  # Party is locked
-        raise HTTPException(status_code=400, detail="Cannot remove participants from a locked party.")
+async def remove_participant(
+    party_id: str,
+    participant_id: str,
+    party: dict = Depends(party_admin_removable),
+    supabase: AsyncClient = Depends(get_db),
+):
+    """Remove a participant from the party. Requires master passcode or admin token."""
     
     # Delete participant
-    response = supabase.table("participants").delete().eq("id", participant_id).eq("party_id", party_id).execute()
+    response = await supabase.table("participants").delete().eq("id", participant_id).eq("party_id", party_id).execute()
+    participant_list_etags.invalidate(party_id)
     
     if not response.data:
         raise HTTPException(status_code=404, detail="Participant not found")
     
+    hub.publish(party_id, "participant_removed", {"id": participant_id})
     return None
 
 
 @router.post("/resend-mine")
-def resend_my_match(party_id: str, request: ResendMyMatch):
+async def resend_my_match(party_id: str, resend: ResendMyMatch, request: Request, supabase: AsyncClient = Depends(get_db)):
     """Resend match email to a specific participant by their email."""
     
-    # Verify party is locked
-    party_response = supabase.table("parties").select("*").eq("id", party_id).execute()
+    # Participant, their party and their giftee in one round trip
+    participant_response = await supabase.table("participants") \
+        .select("*, party:party_id(*), giftee:giftee_id(name, email)") \
+        .eq("party_id", party_id).eq("email", resend.email).execute()
     
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
-    
-    party = party_response.data[0]
+    if participant_response.data:
+        participant = participant_response.data[0]
+        party = participant.pop("party")
+        giftee_data = participant.pop("giftee")
+    else:
+        # Unknown email: look the party up only to report the right error
+        participant = giftee_data = None
+        party = await load_party(request, supabase, party_id)
     
+    # Verify party is locked
     if party["status"]:  # Party is still open
         raise HTTPException(status_code=400, detail="Matching has not started yet.")
     
-    # Find participant
-    participant_response = supabase.table("participants").select("*").eq("party_id", party_id).eq("email", request.email).execute()
-    
-    if not participant_response.data:
+    if participant is None:
         raise HTTPException(status_code=404, detail="Email not found in this party.")
-        
-    participant = participant_response.data[0]
     
     if not participant.get('giftee_id'):
          raise HTTPException(status_code=400, detail="You have not been assigned a match yet.")
          
-    # Get giftee name and email
-    giftee_response = supabase.table("participants").select("name, email").eq("id", participant['giftee_id']).execute()
-    if not giftee_response.data:
+    if giftee_data is None:
         raise HTTPException(status_code=500, detail="Match not found in database.")
         
-    giftee_data = giftee_response.data[0]
     giftee_name = giftee_data['name']
     giftee_email = giftee_data['email']
     
-    if send_match_email(participant, giftee_name, giftee_email, party):
+    if await run_in_threadpool(send_match_email, participant, giftee_name, giftee_email, party):
         return {"message": "Match email has been resent."}
     else:
         raise HTTPException(status_code=500, detail="Failed to send email. Please try again later.")
@@ -1,22 +1,47 @@
-from fastapi import APIRouter, HTTPException, status
-from app.db.supabase import supabase
-from app.utils.email import send_match_email, send_host_email
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from postgrest.exceptions import APIError
+from supabase import AsyncClient
+from typing import Optional
+from app.core.config import settings
+from app.core.security import AdminSessionsDisabled, issue_admin_token
+from app.api.deps import AdminAccess, party_admin, party_admin_only, party_exists
+from app.db.repository import get_db
+from app.db.bulk import update_each
+from app.db.errors import LOCK_ERRORS, RPC_NOT_FOUND
+from app.db.parties import party_cache
+from app.db.participants import participant_list_etags
+from app.utils.etag import etag_matches, make_etag
+from app.utils.email import prepare_match_email, build_host_email
+from app.utils.email_queue import dispatcher
+from app.utils.live import Subscription, TooManyWatchers, format_event, hub
 
 from app.schemas.party import (
     PartyCreate,
     PartyResponse,
     PartyCreatedResponse,
-    PartyAdminAction,
     PartyUpdate,
+    AdminSessionResponse,
+    EmailStatusResponse,
+    DashboardResponse,
 )
-from app.utils.matching import generate_matches
-from app.utils.email import send_match_email
+from app.utils.matching import generate_matches, resolve_matches
 
 router = APIRouter(prefix="/api/party", tags=["Party"])
 
+# Route guards (see app.api.deps.PartyAccess)
+party_open_for_lock = AdminAccess(status=True, status_error="Party is already locked", fresh=True)
+party_matched = AdminAccess(status=False, status_error="Matching has not started yet.")
+party_login = AdminAccess(allow_token=False)  # A token must not renew itself past ADMIN_TOKEN_TTL_SECONDS
+
+# Last message of a party's event stream
+PARTY_DELETED = format_event("party_deleted", {})
+
 
 @router.post("", response_model=PartyCreatedResponse, status_code=status.HTTP_201_CREATED)
-def create_party(party: PartyCreate):
+async def create_party(party: PartyCreate, supabase: AsyncClient = Depends(get_db)):
     """Create a new Secret Santa party."""
     
     # Prepare data for insertion (passcode is auto-generated by Supabase)
@@ -34,20 +59,21 @@ def create_party(party: PartyCreate):
     }
     
     # Insert party
-    response = supabase.table("parties").insert(party_data).execute()
+    response = await supabase.table("parties").insert(party_data).execute()
     
     if not response.data:
         raise HTTPException(status_code=500, detail="Failed to create party")
     
     created_party = response.data[0]
+    party_cache.set(created_party["id"], created_party)
     
     
     # -----------------------------------------------------------
-    #  SEND HOST EMAIL (THIS IS THE CORRECT PLACE)
+    #  QUEUE HOST EMAIL (sent in the background)
     # -----------------------------------------------------------
     room_link = f"https://dhrvm.github.io/SecretSanta/#/party/{created_party['id']}"
     
-    send_host_email(
+    await run_in_threadpool(dispatcher.enqueue, created_party["id"], *build_host_email(
         host={
             "name": created_party["organizer_name"],
             "email": created_party["organizer_email"],
@@ -61,7 +87,7 @@ def create_party(party: PartyCreate):
         },
         room_code=created_party["passcode"],
         room_link=room_link
-    )
+    ))
     # -----------------------------------------------------------
     
 
@@ -72,7 +98,7 @@ def create_party(party: PartyCreate):
             "name": party.organizer_name,
             "email": party.organizer_email,
         }
-        supabase.table("participants").insert(participant_data).execute()
+        await supabase.table("participants").insert(participant_data).execute()
     
     return PartyCreatedResponse(
         id=created_party["id"],
@@ -83,94 +109,107 @@ def create_party(party: PartyCreate):
 
 
 @router.get("/{party_id}", response_model=PartyResponse)
-def get_party(party_id: str):
-    """Get party details by ID."""
-    
-    response = supabase.table("parties").select("*").eq("id", party_id).execute()
+async def get_party(party_id: str, request: Request, response: Response, party: dict = Depends(party_exists)):
+    """Get party details by ID. Answers If-None-Match with 304."""
     
-    if not response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
+    # Derived from the (usually cached) row, so an unchanged party costs no DB call
+    etag = make_etag({k: v for k, v in party.items() if k != "passcode"})
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
     
-    return response.data[0]
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return party
 
 
-@router.patch("/{party_id}", response_model=PartyResponse)
-def update_party(party_id: str, update: PartyUpdate):
-    """Update party details. Requires master passcode."""
+@router.post("/{party_id}/admin/login", response_model=AdminSessionResponse)
+async def admin_login(party_id: str, party: dict = Depends(party_login)):
+    """Exchange the master passcode for a short-lived admin token for this party."""
     
-    # Verify passcode and get party
-    party_response = supabase.table("parties").select("passcode").eq("id", party_id).execute()
-    
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
+    try:
+        token, expires_at = issue_admin_token(party_id)
+    except AdminSessionsDisabled:
+        raise HTTPException(status_code=503, detail="Admin sessions are not enabled on this server.")
     
-    if party_response.data[0]["passcode"] != update.passcode:
-        raise HTTPException(status_code=403, detail="Invalid passcode")
+    return AdminSessionResponse(token=token, expires_at=expires_at)
+
+
+@router.patch("/{party_id}", response_model=PartyResponse)
+async def update_party(party_id: str, body: PartyUpdate, party: Optional[dict] = Depends(party_admin_only), supabase: AsyncClient = Depends(get_db)):
+    """Update party details. Requires master passcode or admin token."""
     
     # Prepare data
     data_to_update = {}
-    if update.name:
-        data_to_update["name"] = update.name
-    if update.description:
-        data_to_update["description"] = update.description
-    if update.budget is not None:
-        data_to_update["budget"] = update.budget
-    if update.event_date:
-        data_to_update["event_date"] = str(update.event_date)
-    if update.event_time:
-        data_to_update["event_time"] = str(update.event_time)
+    if body.name:
+        data_to_update["name"] = body.name
+    if body.description:
+        data_to_update["description"] = body.description
+    if body.budget is not None:
+        data_to_update["budget"] = body.budget
+    if body.event_date:
+        data_to_update["event_date"] = str(body.event_date)
+    if body.event_time:
+        data_to_update["event_time"] = str(body.event_time)
         
     if not data_to_update:
         raise HTTPException(status_code=400, detail="No data to update")
         
     # Perform update
-    response = supabase.table("parties").update(data_to_update).eq("id", party_id).execute()
+    response = await supabase.table("parties").update(data_to_update).eq("id", party_id).execute()
+    party_cache.invalidate(party_id)
     
     if not response.data:
-        raise HTTPException(status_code=500, detail="Failed to update party")
-        
+        raise HTTPException(status_code=404, detail="Party not found")
+    
+    hub.publish(party_id, "party_updated", {})
     return response.data[0]
 
 
 @router.delete("/{party_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_party(party_id: str, auth: PartyAdminAction):
-    """Delete a party. Requires master passcode."""
+async def delete_party(
+    party_id: str,
+    party: Optional[dict] = Depends(party_admin_only),
+    supabase: AsyncClient = Depends(get_db),
+):
+    """Delete a party. Requires master passcode or admin token."""
     
-    # Verify passcode
-    party_response = supabase.table("parties").select("passcode").eq("id", party_id).execute()
+    # Delete party (cascade will delete participants)
+    response = await supabase.table("parties").delete().eq("id", party_id).execute()
+    party_cache.invalidate(party_id)
     
-    if not party_response.data:
+    if not response.data:
         raise HTTPException(status_code=404, detail="Party not found")
-    
-    if party_response.data[0]["passcode"] != auth.passcode:
-        raise HTTPException(status_code=403, detail="Invalid passcode")
-    
-    # Delete party (cascade will delete participants)
-    supabase.table("parties").delete().eq("id", party_id).execute()
+    participant_list_etags.invalidate(party_id)
+    hub.publish(party_id, "party_deleted", {})
     
     return None
 
 
+def _queue_match_emails(party_id: str, party, matches):
+    """Renders every match email and hands the batch to the background dispatcher."""
+    build_email = prepare_match_email(party)
+    emails = [build_email(giver, giftee["name"], giftee["email"]) for giver, giftee in matches]
+    dispatcher.enqueue_many(party_id, emails)
+    return len(emails)
+
+
+async def _lock_without_rpc(supabase: AsyncClient, party_id: str, updates):
+    """Fallback lock for databases without the lock_party_and_match function."""
+    # Only updates: a participant removed since we read the list must not come back
+    await update_each(supabase, "participants", updates)
+    await supabase.table("parties").update({"status": False}).eq("id", party_id).execute()
+
+
 @router.post("/{party_id}/lock")
-def lock_party_and_match(party_id: str, auth: PartyAdminAction):
-    """Lock the party and trigger matching. Requires master passcode."""
-    
-    # Verify passcode and get party
-    party_response = supabase.table("parties").select("*").eq("id", party_id).execute()
-    
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
-    
-    party = party_response.data[0]
-    
-    if party["passcode"] != auth.passcode:
-        raise HTTPException(status_code=403, detail="Invalid passcode")
-    
-    if not party["status"]:  # Already locked
-        raise HTTPException(status_code=400, detail="Party is already locked")
+async def lock_party_and_match(
+    party_id: str,
+    party: dict = Depends(party_open_for_lock),  # Straight from the DB, not the cache
+    supabase: AsyncClient = Depends(get_db),
+):
+    """Lock the party and trigger matching. Requires master passcode or admin token."""
     
     # Get participants
-    participants_response = supabase.table("participants").select("*").eq("party_id", party_id).execute()
+    participants_response = await supabase.table("participants").select("*").eq("party_id", party_id).execute()
     participants = participants_response.data
     
     if len(participants) < 2:
@@ -178,66 +217,138 @@ def lock_party_and_match(party_id: str, auth: PartyAdminAction):
     
     # 1. Generate Matches
     try:
-        updates = generate_matches(participants)
+        updates = generate_matches(participants, mode=settings.MATCHING_MODE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Matching failed: {str(e)}")
     
-    # 2. Update DB
-    for update in updates:
-        supabase.table("participants").update({"giftee_id": update["giftee_id"]}).eq("id", update["id"]).execute()
-        
-    # 3. Send Emails
-    name_map = {p['id']: p['name'] for p in participants}
-    email_map = {p['id']: p['email'] for p in participants}
-    
-    for p in participants:
-        match_entry = next(u for u in updates if u['id'] == p['id'])
-        giftee_name = name_map[match_entry['giftee_id']]
-        giftee_email = email_map[match_entry['giftee_id']]
-        send_match_email(p, giftee_name, giftee_email, party)
-    
-    # Lock the party
-    supabase.table("parties").update({"status": False}).eq("id", party_id).execute()
+    # 2. Store matches and lock the party in one transaction
+    try:
+        await supabase.rpc("lock_party_and_match", {
+            "p_party_id": party_id,
+            "p_passcode": party["passcode"],  # Checked again by the function
+            "p_assignments": updates,
+        }).execute()
+    except APIError as e:
+        if e.code == RPC_NOT_FOUND:
+            # Database has not been migrated yet, so lock the non-atomic way
+            print(f"⚠️ lock_party_and_match is missing (apply supabase/migrations); locking {party_id} with {len(updates)} separate updates")
+            await _lock_without_rpc(supabase, party_id, updates)
+        elif e.code in LOCK_ERRORS:
+            status_code, detail = LOCK_ERRORS[e.code]
+            raise HTTPException(status_code=status_code, detail=detail)
+        else:
+            raise
+    finally:
+        party_cache.invalidate(party_id)
+    hub.publish(party_id, "party_locked", {})
+
+    # 3. Queue Emails (rendered off the event loop, sent in the background)
+    await run_in_threadpool(_queue_match_emails, party_id, party, resolve_matches(participants, updates))
     
-    return {"message": "Matching complete! Emails have been sent."}
+    return {"message": "Matching complete! Emails are being sent."}
 
 
 @router.post("/{party_id}/resend")
-def resend_all_emails(party_id: str, auth: PartyAdminAction):
-    """Resend all match emails. Requires master passcode."""
-    
-    # Verify passcode and get party
-    party_response = supabase.table("parties").select("*").eq("id", party_id).execute()
-    
-    if not party_response.data:
-        raise HTTPException(status_code=404, detail="Party not found")
-    
-    party = party_response.data[0]
-    
-    if party["passcode"] != auth.passcode:
-        raise HTTPException(status_code=403, detail="Invalid passcode")
-    
-    if party["status"]:  # Party is still open
-        raise HTTPException(status_code=400, detail="Matching has not started yet.")
+async def resend_all_emails(
+    party_id: str,
+    party: dict = Depends(party_matched),
+    supabase: AsyncClient = Depends(get_db),
+):
+    """Resend all match emails. Requires master passcode or admin token."""
     
     # Get participants
-    participants_response = supabase.table("participants").select("*").eq("party_id", party_id).execute()
+    participants_response = await supabase.table("participants").select("*").eq("party_id", party_id).execute()
     participants = participants_response.data
     
     if not participants:
         return {"message": "No participants found."}
 
-    # Map names and emails
-    name_map = {p["id"]: p["name"] for p in participants}
-    email_map = {p["id"]: p["email"] for p in participants}
-    
-    count = 0
-    for p in participants:
-        giftee_id = p.get("giftee_id")
-        if giftee_id:
-            giftee_name = name_map.get(giftee_id, "Unknown")
-            giftee_email = email_map.get(giftee_id)
-            if giftee_email and send_match_email(p, giftee_name, giftee_email, party):
-                count += 1
+    matches = [(giver, giftee) for giver, giftee in resolve_matches(participants, participants) if giftee["email"]]
+    count = await run_in_threadpool(_queue_match_emails, party_id, party, matches)
                 
-    return {"message": f"Resent {count} emails."}
+    return {"message": f"Resending {count} emails."}
+
+
+@router.get("/{party_id}/emails", response_model=EmailStatusResponse)
+async def get_email_status(party_id: str, party: dict = Depends(party_exists)):
+    """Get queued/sent/failed email counts for a party."""
+    
+    counts = await run_in_threadpool(dispatcher.status, party_id)
+    return EmailStatusResponse(party_id=party_id, **counts)
+
+
+@router.post("/{party_id}/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    party_id: str,
+    party: dict = Depends(party_admin),
+    supabase: AsyncClient = Depends(get_db),
+):
+    """Party, participants with emails, match and email status for the organizer view. Requires master passcode or admin token."""
+    
+    # The party comes from the cache; participants and email counts are read side by side
+    participants_response, email_counts = await asyncio.gather(
+        supabase.table("participants").select("id, name, email, giftee_id").eq("party_id", party_id).order("id").execute(),
+        run_in_threadpool(dispatcher.status, party_id),
+    )
+    participants = [
+        {"id": p["id"], "name": p["name"], "email": p["email"], "matched": p["giftee_id"] is not None}
+        for p in participants_response.data
+    ]
+    
+    return {
+        "party": party,
+        "participants": participants,
+        "match": {
+            "locked": not party["status"],
+            "participants": len(participants),
+            "matched": sum(p["matched"] for p in participants),
+        },
+        "emails": {"party_id": party_id, **email_counts},
+    }
+
+
+@router.get("/{party_id}/events")
+async def watch_party(party_id: str, party: dict = Depends(party_exists)):
+    """
+    Live party updates as Server-Sent Events: participant_joined,
+    participant_updated, participant_removed, participants_imported,
+    party_updated, party_locked, party_deleted (the stream ends after it),
+    and resync (refetch the list; events were dropped because the stream
+    fell behind).
+    """
+    
+    # Subscribe before answering: over the limit is still a 503, and nothing
+    # published before the stream starts is missed
+    try:
+        subscription = hub.subscribe(party_id)
+    except TooManyWatchers:
+        raise HTTPException(status_code=503, detail="Too many live connections. Please refresh later.")
+    
+    return PartyEventStream(subscription)
+
+
+class PartyEventStream(StreamingResponse):
+    """SSE response that gives its hub subscription back however the stream ends (even if it never starts)."""
+    
+    def __init__(self, subscription: Subscription):
+        super().__init__(
+            _party_events(subscription),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # Don't let proxies hold events back
+        )
+        self.subscription = subscription
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            hub.unsubscribe(self.subscription)
+
+
+async def _party_events(subscription: Subscription):
+    yield "retry: 5000\n\n"  # Browser reconnect delay
+    while True:
+        message = await subscription.next(settings.LIVE_KEEPALIVE_SECONDS)
+        yield message if message is not None else ": keepalive\n\n"
+        if message == PARTY_DELETED:
+            return  # Nothing more will happen to this party
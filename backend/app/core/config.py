@@ -9,6 +9,32 @@ class Settings:
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     EMAIL_SENDER: str | None = os.getenv("EMAIL_SENDER")
     EMAIL_PASSWORD: str | None = os.getenv("EMAIL_PASSWORD")
-    SECRET_KEY: str | None = os.getenv("SECRET_KEY")
+    SECRET_KEY: str | None = os.getenv("SECRET_KEY")  # Signs admin session tokens
+    ADMIN_TOKEN_TTL_SECONDS: int = int(os.getenv("ADMIN_TOKEN_TTL_SECONDS", "3600"))  # Admin session lifetime
+    EMAIL_TRANSPORT: str = os.getenv("EMAIL_TRANSPORT", "smtp")  # "smtp", "memory", "maildir" or "null"
+    EMAIL_MAILDIR: str = os.getenv("EMAIL_MAILDIR", "maildir")  # Output folder for "maildir"
+    SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "true").lower() == "true"  # STARTTLS before login
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", "4"))  # Max concurrent sessions for the account
+    SMTP_RATE_PER_MINUTE: float = float(os.getenv("SMTP_RATE_PER_MINUTE", "300"))  # Provider limit, 0 = unlimited
+    SMTP_BURST: int = int(os.getenv("SMTP_BURST", "20"))  # Emails allowed back-to-back before throttling
+    EMAIL_WORKERS: int = int(os.getenv("EMAIL_WORKERS", "4"))  # Background email sender threads
+    EMAIL_OUTBOX: str = os.getenv("EMAIL_OUTBOX", "sqlite")  # "sqlite", "supabase" or "memory" (lost on restart)
+    EMAIL_OUTBOX_PATH: str = os.getenv("EMAIL_OUTBOX_PATH", "email_outbox.sqlite3")  # Spool file for "sqlite"
+    EMAIL_OUTBOX_POLL_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+    EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_SECONDS: float = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))  # Doubles after each failure
+    MATCHING_MODE: str = os.getenv("MATCHING_MODE", "uniform")  # "uniform" or "single-cycle"
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "supabase")  # "supabase", "sql" (DATABASE_URL) or "memory" (not persisted)
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///secret_santa.sqlite3")  # sqlite:///path or postgresql://...
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))  # Pooled connections for DB_BACKEND=sql
+    DB_BATCH_SIZE: int = int(os.getenv("DB_BATCH_SIZE", "500"))  # Rows per bulk write request
+    PARTY_CACHE_SIZE: int = int(os.getenv("PARTY_CACHE_SIZE", "1024"))  # Party rows kept in memory
+    PARTY_CACHE_TTL_SECONDS: float = float(os.getenv("PARTY_CACHE_TTL_SECONDS", "30"))  # Max staleness across workers
+    LIVE_QUEUE_SIZE: int = int(os.getenv("LIVE_QUEUE_SIZE", "32"))  # Events buffered per watcher before it must resync
+    LIVE_MAX_WATCHERS: int = int(os.getenv("LIVE_MAX_WATCHERS", "10000"))  # Open event streams per worker
+    LIVE_KEEPALIVE_SECONDS: float = float(os.getenv("LIVE_KEEPALIVE_SECONDS", "15"))  # Comment sent on idle streams
+    DB_MAX_IN_FLIGHT: int = int(os.getenv("DB_MAX_IN_FLIGHT", "100"))  # Concurrent Supabase requests from the API
 
 settings = Settings()
@@ -0,0 +1,67 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request
+
+from app.core.config import settings
+
+
+class AdminSessionsDisabled(Exception):
+    """Raised when issuing a token without SECRET_KEY configured."""
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(payload: str) -> str:
+    key = settings.SECRET_KEY.encode()
+    return _b64encode(hmac.new(key, b"admin-session." + payload.encode(), hashlib.sha256).digest())
+
+
+def issue_admin_token(party_id: str, now: Optional[float] = None) -> Tuple[str, int]:
+    """
+    Returns (token, expires_at) for an admin session on one party.
+    The token is `payload.signature`, both base64url; the payload holds the
+    party id and expiry, the signature is HMAC-SHA256 under SECRET_KEY.
+    """
+    if not settings.SECRET_KEY:
+        raise AdminSessionsDisabled("SECRET_KEY is not set")
+    expires_at = int((now if now is not None else time.time()) + settings.ADMIN_TOKEN_TTL_SECONDS)
+    payload = _b64encode(json.dumps({"party": party_id, "exp": expires_at}, separators=(",", ":")).encode())
+    return f"{payload}.{_signature(payload)}", expires_at
+
+
+def verify_admin_token(token: str, party_id: str, now: Optional[float] = None) -> bool:
+    """True if `token` was issued by this server for `party_id` and has not expired. No DB access."""
+    if not settings.SECRET_KEY or token.count(".") != 1:
+        return False
+    payload, signature = token.split(".")
+    if not hmac.compare_digest(signature.encode(), _signature(payload).encode()):
+        return False
+    try:
+        claims: Dict[str, Any] = json.loads(_b64decode(payload))
+    except ValueError:
+        return False
+    return claims.get("party") == party_id and claims.get("exp", 0) > (now if now is not None else time.time())
+
+
+def has_admin_token(request: Request, party_id: str) -> bool:
+    """True if the request carries `Authorization: Bearer <token>` valid for the party."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and verify_admin_token(token.strip(), party_id)
+
+
+def passcode_matches(party: Dict[str, Any], passcode: Optional[str]) -> bool:
+    """Compares a submitted passcode with the party's in constant time."""
+    if passcode is None:
+        return False
+    return hmac.compare_digest(str(party["passcode"]).encode(), passcode.encode())
@@ -0,0 +1,32 @@
+import asyncio
+from typing import List, Dict, Any, Iterator, Optional
+from supabase import AsyncClient
+from app.core.config import settings
+
+
+def chunked(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yields consecutive slices of at most `size` rows."""
+    if size < 1:
+        raise ValueError("Batch size must be at least 1.")
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def update_each(supabase: AsyncClient, table: str, rows: List[Dict[str, Any]], batch_size: Optional[int] = None, key: str = "id") -> List[Dict[str, Any]]:
+    """
+    Concurrent per-row fallback, not a bulk write: one UPDATE request per row,
+    `batch_size` (DB_BATCH_SIZE) of them in flight at a time, so N rows still
+    cost N round trips. Each row's other columns are set on the existing row
+    with the same `key`; rows that no longer exist are skipped, never
+    re-inserted (an upsert would recreate them, and PostgREST has no
+    multi-row UPDATE). Prefer a database function for anything large.
+    """
+    written = []
+    for batch in chunked(rows, batch_size or settings.DB_BATCH_SIZE):
+        responses = await asyncio.gather(*(
+            supabase.table(table).update({c: v for c, v in row.items() if c != key}).eq(key, row[key]).execute()
+            for row in batch
+        ))
+        for response in responses:
+            written.extend(response.data)
+    return written
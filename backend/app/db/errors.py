@@ -0,0 +1,25 @@
+# Error codes shared by the DB backends and the routes that call their functions
+
+# PostgREST code when an RPC function does not exist in the database
+RPC_NOT_FOUND = "PGRST202"
+
+# Errors raised by the join_party database function (by SQLSTATE) -> HTTP response
+JOIN_ERRORS = {
+    "P0002": (404, "Party not found"),
+    "55000": (400, "Party is locked. No new participants allowed."),
+    "23505": (400, "This email is already registered for this party."),
+}
+
+# Errors raised by the lock_party_and_match database function (by SQLSTATE) -> HTTP response
+LOCK_ERRORS = {
+    "P0002": (404, "Party not found"),
+    "28P01": (403, "Invalid passcode"),
+    "55000": (400, "Party is already locked"),
+    "40001": (409, "Participants changed while matching. Please try again."),
+}
+
+# Errors raised by the import_participants database function (by SQLSTATE) -> HTTP response
+IMPORT_ERRORS = {
+    "P0002": JOIN_ERRORS["P0002"],
+    "55000": JOIN_ERRORS["55000"],
+}
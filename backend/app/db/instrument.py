@@ -0,0 +1,104 @@
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+from app.utils.metrics import registry
+
+DB_QUERY_SECONDS = registry.histogram("db_query_duration_seconds", "Database calls by table (or rpc) and operation (or function).", ["table", "operation"])
+DB_QUERY_ERRORS = registry.counter("db_query_errors_total", "Database calls that raised.", ["table", "operation"])
+DB_IN_FLIGHT = registry.gauge("db_queries_in_flight", "Database calls currently running.")
+
+
+class QueryStats:
+    """Database calls made while serving one request."""
+
+    def __init__(self):
+        self.calls: List[Tuple[str, float]] = []  # ("participants.select", seconds)
+
+    def record(self, label: str, seconds: float):
+        self.calls.append((label, seconds))
+
+    @property
+    def count(self) -> int:
+        return len(self.calls)
+
+    @property
+    def seconds(self) -> float:
+        return sum(seconds for _, seconds in self.calls)
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header."""
+        return f'db;desc="{self.count} queries";dur={self.seconds * 1000:.1f}'
+
+
+# Stats of the request being served (set by the middleware in app.main)
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> QueryStats:
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+# Builder methods that pick the kind of statement a query runs
+QUERY_OPERATIONS = {"select", "insert", "update", "upsert", "delete"}
+
+
+class _TimedQuery:
+    """Passes builder calls through and times execute() into the request's QueryStats."""
+
+    def __init__(self, builder, target: str, operation: str):
+        self._builder = builder
+        self._target = target
+        self._operation = operation
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return self._wrap(attr, self._operation)
+        operation = name if name in QUERY_OPERATIONS else self._operation
+
+        def call(*args, **kwargs):
+            return self._wrap(attr(*args, **kwargs), operation)
+
+        return call
+
+    def _wrap(self, result, operation: str):
+        if hasattr(result, "execute"):
+            return _TimedQuery(result, self._target, operation)
+        return result
+
+    async def execute(self):
+        DB_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            return await self._builder.execute()
+        except Exception:
+            DB_QUERY_ERRORS.inc(self._target, self._operation)
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            DB_IN_FLIGHT.dec()
+            DB_QUERY_SECONDS.observe(seconds, self._target, self._operation)
+            stats = _query_stats.get()
+            if stats is not None:
+                stats.record(f"{self._target}.{self._operation}", seconds)
+
+
+class InstrumentedClient:
+    """
+    Wraps an async database client so every table() / rpc() call that gets
+    executed is counted and timed for the current request.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str) -> _TimedQuery:
+        return _TimedQuery(self._client.table(name), name, "select")
+
+    def rpc(self, fn: str, params=None, **kwargs) -> _TimedQuery:
+        return _TimedQuery(self._client.rpc(fn, params or {}, **kwargs), "rpc", fn)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
@@ -0,0 +1,290 @@
+import operator
+import uuid
+from typing import Any, Dict, List
+from postgrest.exceptions import APIError
+from app.db.errors import RPC_NOT_FOUND
+
+# Foreign key column -> referenced table, for embedded selects
+FOREIGN_KEYS = {"party_id": "parties", "giftee_id": "participants"}
+
+# Unique indexes beyond the primary key
+UNIQUE = {"participants": [("party_id", "email")]}
+
+# Child tables removed with their parent row (ON DELETE CASCADE)
+CASCADES = {"parties": [("participants", "party_id")]}
+
+# Filter methods of the query builder
+OPERATORS = {"eq": operator.eq, "gt": operator.gt}
+
+
+def split_columns(columns: str) -> List[str]:
+    """Splits a PostgREST select list on top-level commas."""
+    parts, depth, current = [], 0, ""
+    for char in columns:
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    parts.append(current.strip())
+    return parts
+
+
+class MemoryResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class MemoryQuery:
+    """The subset of the async PostgREST query builder the routes use."""
+
+    def __init__(self, db: "MemoryClient", table: str):
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.payload = None
+        self.filters = []
+        self.ordering = None
+        self.row_limit = None
+
+    def select(self, columns="*"):
+        self.action, self.columns = "select", columns
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload, on_conflict="id"):
+        self.action, self.payload = "upsert", payload
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, "eq", value))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append((column, "gt", value))
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering = (column, desc)
+        return self
+
+    def limit(self, size):
+        self.row_limit = size
+        return self
+
+    def _matching_rows(self):
+        rows = self.db.table_rows(self.table)
+        filters = self.filters
+        # Primary-key lookups go straight to the row, like an indexed query would
+        if filters and filters[0][:2] == ("id", "eq"):
+            row = rows.get(filters[0][2])
+            candidates = [row] if row is not None else []
+            filters = filters[1:]
+        else:
+            candidates = rows.values()
+        return [r for r in candidates if all(OPERATORS[op](r.get(c), v) for c, op, v in filters)]
+
+    def _project(self, row, columns=None):
+        columns = self.columns if columns is None else columns
+        projected = {}
+        for column in split_columns(columns):
+            if "(" in column:
+                # Embedded resource, e.g. "giftee:giftee_id(name, email)"
+                alias, rest = column.split(":", 1)
+                fk, inner = rest[:-1].split("(", 1)
+                target = self.db.table_rows(FOREIGN_KEYS[fk.strip()]).get(row.get(fk.strip()))
+                projected[alias.strip()] = self._project(target, inner) if target is not None else None
+            elif column == "*":
+                projected.update(row)
+            else:
+                projected[column] = row.get(column)
+        return projected
+
+    async def execute(self):
+        self.db.log(self.table, self.action)
+        rows = self.db.table_rows(self.table)
+
+        if self.action == "select":
+            matching = self._matching_rows()
+            if self.ordering is not None:
+                column, desc = self.ordering
+                matching.sort(key=lambda r: r.get(column), reverse=desc)
+            if self.row_limit is not None:
+                matching = matching[:self.row_limit]
+            return MemoryResponse([self._project(r) for r in matching])
+
+        if self.action == "insert":
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            new_rows = []
+            for item in payload:
+                row = self.db.new_row(self.table)
+                row.update(item)
+                new_rows.append(row)
+            self.db.check_unique(self.table, new_rows)  # All or nothing, like one INSERT statement
+            inserted = []
+            for row in new_rows:
+                rows[row["id"]] = row
+                inserted.append(dict(row))
+            return MemoryResponse(inserted)
+
+        if self.action == "upsert":
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            written = []
+            for item in payload:
+                row = rows.get(item["id"])
+                if row is None:
+                    row = rows[item["id"]] = self.db.new_row(self.table)
+                row.update(item)
+                written.append(dict(row))
+            return MemoryResponse(written)
+
+        if self.action == "update":
+            updated = []
+            for row in self._matching_rows():
+                row.update(self.payload)
+                updated.append(dict(row))
+            return MemoryResponse(updated)
+
+        if self.action == "delete":
+            deleted = self._matching_rows()
+            for row in deleted:
+                self.db.delete_row(self.table, row["id"])
+            return MemoryResponse([dict(r) for r in deleted])
+
+        raise NotImplementedError(self.action)
+
+
+class MemoryRpc:
+    def __init__(self, db: "MemoryClient", name: str, params: Dict[str, Any]):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    async def execute(self):
+        self.db.log("rpc", self.name)
+        function = self.db.functions.get(self.name)
+        if function is None:
+            raise APIError({"code": RPC_NOT_FOUND, "message": f"Could not find the function public.{self.name}"})
+        return MemoryResponse(function(**self.params))
+
+
+class MemoryClient:
+    """
+    In-process stand-in for the async Supabase client (DB_BACKEND=memory).
+    Tables are dicts of rows keyed by id; the database functions from
+    supabase/migrations are reimplemented in Python and raise the same
+    SQLSTATE codes, so the routes behave exactly as they do against Postgres.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[Any, Dict[str, Any]]] = {"parties": {}, "participants": {}}
+        self.defaults = {
+            "parties": lambda: {"passcode": str(uuid.uuid4()), "description": "", "status": True},
+            "participants": lambda: {"id": str(uuid.uuid4()), "giftee_id": None},
+        }
+        # Database functions; drop one to simulate an unmigrated DB
+        self.functions = {
+            "lock_party_and_match": self._lock_party_and_match,
+            "join_party": self._join_party,
+            "import_participants": self._import_participants,
+        }
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params=None) -> MemoryRpc:
+        return MemoryRpc(self, name, params or {})
+
+    def log(self, target: str, action: str):
+        """Called for every executed query (hook for tests)."""
+
+    def table_rows(self, name: str) -> Dict[Any, Dict[str, Any]]:
+        return self.tables.setdefault(name, {})
+
+    def new_row(self, table: str) -> Dict[str, Any]:
+        defaults = self.defaults.get(table)
+        return dict(defaults()) if defaults else {"id": str(uuid.uuid4())}
+
+    def check_unique(self, table: str, new_rows: List[Dict[str, Any]]):
+        """Raises the Postgres unique_violation if any of `new_rows` would duplicate a unique key."""
+        for columns in UNIQUE.get(table, []):
+            keys = {tuple(other.get(c) for c in columns) for other in self.table_rows(table).values()}
+            for row in new_rows:
+                key = tuple(row.get(c) for c in columns)
+                if key in keys:
+                    raise APIError({"code": "23505", "message": f"duplicate key value violates unique constraint ({', '.join(columns)})"})
+                keys.add(key)
+
+    def delete_row(self, table: str, row_id):
+        self.tables[table].pop(row_id, None)
+        for child, column in CASCADES.get(table, []):
+            rows = self.table_rows(child)
+            for child_id in [cid for cid, r in rows.items() if r.get(column) == row_id]:
+                del rows[child_id]
+
+    def _join_party(self, p_party_id, p_name, p_email):
+        party = self.tables["parties"].get(p_party_id)
+        if party is None:
+            raise APIError({"code": "P0002", "message": "party_not_found"})
+        if not party["status"]:
+            raise APIError({"code": "55000", "message": "party_locked"})
+
+        row = self.new_row("participants")
+        row.update({"party_id": p_party_id, "name": p_name, "email": p_email})
+        self.check_unique("participants", [row])
+        self.tables["participants"][row["id"]] = row
+        return dict(row)
+
+    def _import_participants(self, p_party_id, p_participants):
+        party = self.tables["parties"].get(p_party_id)
+        if party is None:
+            raise APIError({"code": "P0002", "message": "party_not_found"})
+        if not party["status"]:
+            raise APIError({"code": "55000", "message": "party_locked"})
+
+        # ON CONFLICT (party_id, email) DO NOTHING
+        taken = {(p["party_id"], p["email"]) for p in self.tables["participants"].values()}
+        inserted = []
+        for item in p_participants:
+            if (p_party_id, item["email"]) in taken:
+                continue
+            taken.add((p_party_id, item["email"]))
+            row = self.new_row("participants")
+            row.update({"party_id": p_party_id, "name": item["name"], "email": item["email"]})
+            self.tables["participants"][row["id"]] = row
+            inserted.append(dict(row))
+        return inserted
+
+    def _lock_party_and_match(self, p_party_id, p_passcode, p_assignments):
+        party = self.tables["parties"].get(p_party_id)
+        if party is None:
+            raise APIError({"code": "P0002", "message": "party_not_found"})
+        if party["passcode"] != p_passcode:
+            raise APIError({"code": "28P01", "message": "invalid_passcode"})
+        if not party["status"]:
+            raise APIError({"code": "55000", "message": "party_locked"})
+
+        members = {pid for pid, p in self.tables["participants"].items() if p["party_id"] == p_party_id}
+        givers = {a["id"] for a in p_assignments}
+        giftees = {a["giftee_id"] for a in p_assignments}
+        if givers != members or not giftees <= members or len(p_assignments) != len(members):
+            raise APIError({"code": "40001", "message": "participants_changed"})
+
+        for a in p_assignments:
+            self.tables["participants"][a["id"]]["giftee_id"] = a["giftee_id"]
+        party["status"] = False
+        return None
@@ -0,0 +1,40 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from supabase import AsyncClient
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+# ETag of each party's public participant list. Writes in this process
+# invalidate it; another worker's writes show up after PARTY_CACHE_TTL_SECONDS,
+# the same bound as party_cache.
+participant_list_etags = TTLCache(settings.PARTY_CACHE_SIZE, settings.PARTY_CACHE_TTL_SECONDS)
+
+
+async def get_participant_page(supabase: AsyncClient, party_id: str, columns: str, limit: int, after: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Returns up to `limit` participants of a party ordered by id, starting
+    after the id `after` (keyset pagination, so every page costs the same).
+    """
+    query = supabase.table("participants").select(columns).eq("party_id", party_id)
+    if after is not None:
+        query = query.gt("id", after)
+    response = await query.order("id").limit(limit).execute()
+    return response.data
+
+
+async def iter_participant_pages(supabase: AsyncClient, party_id: str, columns: str, page_size: int, after: Optional[str] = None, limit: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yields the party's participants one page at a time, so only `page_size`
+    rows are held in memory however big the party is. Stops after `limit`
+    rows when given. `columns` must include id (it is the cursor).
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        page = await get_participant_page(supabase, party_id, columns, size, after)
+        if page:
+            yield page
+        if len(page) < size:
+            return
+        after = page[-1]["id"]
+        if remaining is not None:
+            remaining -= len(page)
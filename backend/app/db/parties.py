@@ -0,0 +1,25 @@
+from typing import Any, Dict, Optional
+from supabase import AsyncClient
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+# Party rows by id. Per process, so another worker's writes show up here after
+# at most PARTY_CACHE_TTL_SECONDS; writes in this process invalidate at once.
+# Fine for reads, but a write that depends on `status` must read it fresh.
+party_cache = TTLCache(settings.PARTY_CACHE_SIZE, settings.PARTY_CACHE_TTL_SECONDS)
+
+
+async def get_party_row(supabase: AsyncClient, party_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the full `parties` row (or None), reading through party_cache.
+    The row is shared between requests, so callers must not modify it, and
+    it may be stale: don't base a write on it (see PartyAccess(fresh=True)).
+    """
+    party = party_cache.get(party_id)
+    if party is None:
+        response = await supabase.table("parties").select("*").eq("id", party_id).execute()
+        if not response.data:
+            return None
+        party = response.data[0]
+        party_cache.set(party_id, party)
+    return party
@@ -0,0 +1,37 @@
+from app.core.config import settings
+from app.db.instrument import InstrumentedClient
+from app.db.memory import MemoryClient
+
+_memory: InstrumentedClient | None = None
+_sql: InstrumentedClient | None = None
+
+
+async def get_db() -> InstrumentedClient:
+    """
+    FastAPI dependency for the storage backend selected by settings.DB_BACKEND.
+    Every backend exposes the same table()/rpc() query builder, so routes
+    don't care which one they get.
+    """
+    global _memory, _sql
+    if settings.DB_BACKEND == "supabase":
+        # Imported lazily so other backends run without Supabase credentials
+        from app.db.supabase import get_async_supabase
+        return await get_async_supabase()
+    if settings.DB_BACKEND == "sql":
+        if _sql is None:
+            from app.db.sql import SQLClient
+            _sql = InstrumentedClient(SQLClient.from_url(settings.DATABASE_URL, settings.DB_POOL_SIZE))
+        return _sql
+    if settings.DB_BACKEND == "memory":
+        if _memory is None:
+            _memory = InstrumentedClient(MemoryClient())
+        return _memory
+    raise ValueError(f"Unknown DB_BACKEND '{settings.DB_BACKEND}'. Expected supabase, sql or memory.")
+
+
+def close_db():
+    """Closes pooled SQL connections (the next get_db() reconnects)."""
+    global _sql
+    if _sql is not None:
+        _sql.close()
+        _sql = None
@@ -0,0 +1,525 @@
+import queue
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from postgrest.exceptions import APIError
+
+from app.db.errors import RPC_NOT_FOUND
+from app.db.memory import FOREIGN_KEYS, split_columns
+
+# Columns of each table, in order ("*" expands to these)
+SCHEMA = {
+    "parties": [
+        "id", "passcode", "name", "description", "budget", "currency", "event_date", "event_time",
+        "organizer_name", "organizer_email", "status", "created_time",
+    ],
+    "participants": ["id", "party_id", "name", "email", "giftee_id", "created_at"],
+}
+
+# SQLite hands booleans back as 0/1
+BOOL_COLUMNS = {"status"}
+
+SQLITE_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS parties (
+        id TEXT PRIMARY KEY,
+        passcode TEXT NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT,
+        budget INTEGER,
+        currency TEXT NOT NULL,
+        event_date TEXT NOT NULL,
+        event_time TEXT NOT NULL,
+        organizer_name TEXT NOT NULL,
+        organizer_email TEXT NOT NULL,
+        status BOOLEAN NOT NULL DEFAULT 1,
+        created_time TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS participants (
+        id TEXT PRIMARY KEY,
+        party_id TEXT NOT NULL REFERENCES parties (id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        giftee_id TEXT REFERENCES participants (id) ON DELETE SET NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS participants_party_id ON participants (party_id, id)",  # Keyset pages
+    "CREATE UNIQUE INDEX IF NOT EXISTS participants_party_email ON participants (party_id, email)",
+]
+
+POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS parties (
+        id text PRIMARY KEY,
+        passcode uuid NOT NULL DEFAULT gen_random_uuid(),
+        name text NOT NULL,
+        description text,
+        budget int4,
+        currency text NOT NULL,
+        event_date date NOT NULL,
+        event_time timetz NOT NULL,
+        organizer_name text NOT NULL,
+        organizer_email text NOT NULL,
+        status bool NOT NULL DEFAULT true,
+        created_time timestamp DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS participants (
+        id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+        party_id text NOT NULL REFERENCES parties (id) ON DELETE CASCADE,
+        name text NOT NULL,
+        email text NOT NULL,
+        giftee_id uuid REFERENCES participants (id) ON DELETE SET NULL,
+        created_at timestamp DEFAULT now()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS participants_party_id ON participants (party_id, id)",  # Keyset pages
+    "CREATE UNIQUE INDEX IF NOT EXISTS participants_party_email ON participants (party_id, email)",
+]
+
+# Stay under the bind-parameter limit of both databases
+MAX_PARAMS = 30000
+
+# Postgres errors that are an answer about the data (surfaced as APIError, like
+# PostgREST would), besides integrity violations (class 23). Anything else,
+# e.g. 08xxx connection failures or 57P01 admin shutdown, stays an exception
+# so the pool drops the connection.
+API_SQLSTATES = {"P0002", "55000", "40001", "28P01"}
+
+
+def _defaults(table: str) -> Dict[str, Any]:
+    if table == "parties":
+        return {"passcode": str(uuid.uuid4()), "description": "", "status": True}
+    if table == "participants":
+        return {"id": str(uuid.uuid4()), "giftee_id": None}
+    return {}
+
+
+def _json_value(column: str, value: Any) -> Any:
+    """Converts a DB value to what PostgREST would have returned in JSON."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if column in BOOL_COLUMNS and value is not None:
+        return bool(value)
+    return value
+
+
+def _check_column(table: str, column: str) -> str:
+    # Column names are spliced into SQL, so only known ones get through
+    if column not in SCHEMA[table]:
+        raise ValueError(f"Unknown column {table}.{column}")
+    return column
+
+
+class SQLiteDialect:
+    placeholder = "?"
+    ddl = SQLITE_DDL
+    for_update = ""  # BEGIN IMMEDIATE already holds the write lock
+    for_share = ""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def transaction(self, conn, write: bool):
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def api_error(self, exc: Exception) -> Optional[APIError]:
+        if isinstance(exc, sqlite3.IntegrityError):
+            code = "23505" if "UNIQUE" in str(exc) else "23503" if "FOREIGN KEY" in str(exc) else "23000"
+            return APIError({"code": code, "message": str(exc)})
+        return None
+
+
+class PostgresDialect:
+    placeholder = "%s"
+    ddl = POSTGRES_DDL
+    for_update = " FOR UPDATE"
+    for_share = " FOR SHARE"
+
+    def __init__(self, url: str):
+        try:
+            import psycopg
+        except ImportError as e:
+            raise ImportError("DATABASE_URL points at Postgres; install psycopg (pip install 'psycopg[binary]').") from e
+        self._psycopg = psycopg
+        self.url = url
+
+    def connect(self):
+        return self._psycopg.connect(self.url)
+
+    @contextmanager
+    def transaction(self, conn, write: bool):
+        try:
+            yield
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def api_error(self, exc: Exception) -> Optional[APIError]:
+        sqlstate = getattr(exc, "sqlstate", None) or ""
+        if sqlstate.startswith("23") or sqlstate in API_SQLSTATES:
+            return APIError({"code": sqlstate, "message": str(exc)})
+        return None
+
+
+class ConnectionPool:
+    """Up to `size` open connections, handed out one thread at a time."""
+
+    def __init__(self, connect: Callable[[], Any], size: int):
+        self._connect = connect
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except APIError:
+                self._put_back(conn)  # Expected outcome, connection is usually fine
+                raise
+            except BaseException:
+                conn.close()  # May be broken; open a fresh one next time
+                raise
+            self._put_back(conn)
+        finally:
+            self._slots.release()
+
+    def _put_back(self, conn):
+        # psycopg flags a connection the server dropped; sqlite3 has no such attributes
+        if getattr(conn, "broken", False) or getattr(conn, "closed", False):
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SQLResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+def _rows(cursor) -> List[Dict[str, Any]]:
+    names = [d[0] for d in cursor.description]
+    return [{name: _json_value(name, value) for name, value in zip(names, row)} for row in cursor.fetchall()]
+
+
+class SQLQuery:
+    """The table()/select()/eq()/execute() builder of the PostgREST client, compiled to SQL."""
+
+    def __init__(self, db: "SQLClient", table: str):
+        if table not in SCHEMA:
+            raise ValueError(f"Unknown table {table}")
+        self.db = db
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.payload = None
+        self.on_conflict = "id"
+        self.filters: List[Tuple[str, str, Any]] = []
+        self.ordering: Optional[Tuple[str, bool]] = None
+        self.row_limit: Optional[int] = None
+
+    def select(self, columns="*"):
+        self.action, self.columns = "select", columns
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def upsert(self, payload, on_conflict="id"):
+        self.action, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((_check_column(self.table, column), "=", value))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append((_check_column(self.table, column), ">", value))
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering = (_check_column(self.table, column), desc)
+        return self
+
+    def limit(self, size):
+        self.row_limit = int(size)
+        return self
+
+    def _where(self, prefix: str = "") -> Tuple[str, List[Any]]:
+        if not self.filters:
+            return "", []
+        ph = self.db.dialect.placeholder
+        clause = " AND ".join(f"{prefix}{column} {op} {ph}" for column, op, _ in self.filters)
+        return f" WHERE {clause}", [value for _, _, value in self.filters]
+
+    def _expand(self, table: str, columns: str) -> List[str]:
+        names = []
+        for column in split_columns(columns):
+            names.extend(SCHEMA[table] if column == "*" else [_check_column(table, column)])
+        return names
+
+    def _select(self, conn):
+        # layout: (embed alias or None, columns) in the order they are selected
+        fields, joins, layout = [], [], []
+        for spec in split_columns(self.columns):
+            if "(" in spec:
+                alias, rest = spec.split(":", 1)
+                fk, inner = rest[:-1].split("(", 1)
+                fk = _check_column(self.table, fk.strip())
+                target, join = FOREIGN_KEYS[fk], f"e{len(joins)}"
+                joins.append(f" LEFT JOIN {target} {join} ON {join}.id = t.{fk}")
+                columns = ["id"] + self._expand(target, inner)  # id tells a missing row from a NULL column
+                fields.extend(f"{join}.{c}" for c in columns)
+                layout.append((alias.strip(), columns))
+            else:
+                columns = self._expand(self.table, spec)
+                fields.extend(f"t.{c}" for c in columns)
+                layout.append((None, columns))
+
+        where, params = self._where("t.")
+        if self.ordering is not None:
+            column, desc = self.ordering
+            where += f" ORDER BY t.{column}{' DESC' if desc else ''}"
+        if self.row_limit is not None:
+            where += f" LIMIT {self.row_limit}"
+        cursor = conn.execute(f"SELECT {', '.join(fields)} FROM {self.table} t{''.join(joins)}{where}", params)
+        results = []
+        for row in cursor.fetchall():
+            values = iter(row)
+            item: Dict[str, Any] = {}
+            for alias, columns in layout:
+                chunk = {c: _json_value(c, next(values)) for c in columns}
+                if alias is None:
+                    item.update(chunk)
+                else:
+                    embedded_id = chunk.pop("id")
+                    if "id" in columns[1:]:
+                        chunk["id"] = embedded_id
+                    item[alias] = chunk if embedded_id is not None else None
+            results.append(item)
+        return results
+
+    def _insert(self, conn, upsert: bool):
+        payload = self.payload if isinstance(self.payload, list) else [self.payload]
+        if not payload:
+            return []
+        rows = [{**_defaults(self.table), **item} for item in payload]
+        columns = [c for c in SCHEMA[self.table] if any(c in row for row in rows)]
+        ph = self.db.dialect.placeholder
+        values = "(" + ", ".join([ph] * len(columns)) + ")"
+
+        conflict = ""
+        if upsert:
+            key = _check_column(self.table, self.on_conflict)
+            changed = [c for c in columns if c != key and any(c in item for item in payload)]
+            updates = ", ".join(f"{c} = excluded.{c}" for c in changed)
+            conflict = f" ON CONFLICT ({key}) DO UPDATE SET {updates}" if updates else f" ON CONFLICT ({key}) DO NOTHING"
+
+        written = []
+        batch = max(1, MAX_PARAMS // len(columns))
+        for start in range(0, len(rows), batch):
+            chunk = rows[start:start + batch]
+            sql = (
+                f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES {', '.join([values] * len(chunk))}"
+                f"{conflict} RETURNING *"
+            )
+            params = [row.get(c) for row in chunk for c in columns]
+            written.extend(_rows(conn.execute(sql, params)))
+        return written
+
+    def _update(self, conn):
+        ph = self.db.dialect.placeholder
+        columns = [_check_column(self.table, c) for c in self.payload]
+        where, params = self._where()
+        sql = f"UPDATE {self.table} SET {', '.join(f'{c} = {ph}' for c in columns)}{where} RETURNING *"
+        return _rows(conn.execute(sql, [self.payload[c] for c in columns] + params))
+
+    def _delete(self, conn):
+        where, params = self._where()
+        return _rows(conn.execute(f"DELETE FROM {self.table}{where} RETURNING *", params))
+
+    def _run(self, conn):
+        if self.action == "select":
+            return self._select(conn)
+        if self.action in ("insert", "upsert"):
+            return self._insert(conn, upsert=self.action == "upsert")
+        if self.action == "update":
+            return self._update(conn)
+        if self.action == "delete":
+            return self._delete(conn)
+        raise NotImplementedError(self.action)
+
+    async def execute(self):
+        data = await run_in_threadpool(self.db.run, self._run, self.action != "select")
+        return SQLResponse(data)
+
+
+class SQLRpc:
+    def __init__(self, db: "SQLClient", name: str, params: Dict[str, Any]):
+        self.db = db
+        self.name = name
+        self.params = params
+
+    async def execute(self):
+        function = self.db.functions.get(self.name)
+        if function is None:
+            raise APIError({"code": RPC_NOT_FOUND, "message": f"Could not find the function public.{self.name}"})
+        data = await run_in_threadpool(self.db.run, lambda conn: function(conn, **self.params), True)
+        return SQLResponse(data)
+
+
+class SQLClient:
+    """
+    Talks to SQLite or Postgres directly (DB_BACKEND=sql) through a pool of
+    connections, with the same table()/rpc() interface as the Supabase client.
+    Each execute() is its own transaction; the database functions from
+    supabase/migrations are reimplemented here and raise the same SQLSTATE codes.
+    """
+
+    def __init__(self, dialect, pool_size: int = 5):
+        self.dialect = dialect
+        self.pool = ConnectionPool(dialect.connect, pool_size)
+        self.functions = {
+            "lock_party_and_match": self._lock_party_and_match,
+            "join_party": self._join_party,
+            "import_participants": self._import_participants,
+        }
+        self.run(lambda conn: [conn.execute(statement) for statement in dialect.ddl], True)
+
+    @classmethod
+    def from_url(cls, url: str, pool_size: int = 5) -> "SQLClient":
+        if url.startswith("sqlite:///"):
+            return cls(SQLiteDialect(url[len("sqlite:///"):]), pool_size)
+        if url.startswith(("postgres://", "postgresql://")):
+            return cls(PostgresDialect(url), pool_size)
+        raise ValueError(f"Unsupported DATABASE_URL '{url}'. Expected sqlite:///path or postgresql://...")
+
+    def table(self, name: str) -> SQLQuery:
+        return SQLQuery(self, name)
+
+    def rpc(self, name: str, params=None) -> SQLRpc:
+        return SQLRpc(self, name, params or {})
+
+    def run(self, work: Callable[[Any], Any], write: bool):
+        """Runs work(conn) in one transaction on a pooled connection (blocking)."""
+        with self.pool.connection() as conn:
+            try:
+                with self.dialect.transaction(conn, write):
+                    return work(conn)
+            except APIError:
+                raise
+            except Exception as e:
+                error = self.dialect.api_error(e)
+                if error is None:
+                    raise
+                raise error from e
+
+    def close(self):
+        self.pool.close()
+
+    def _join_party(self, conn, p_party_id, p_name, p_email):
+        ph = self.dialect.placeholder
+        party = conn.execute(f"SELECT status FROM parties WHERE id = {ph}{self.dialect.for_share}", [p_party_id]).fetchone()
+        if party is None:
+            raise APIError({"code": "P0002", "message": "party_not_found"})
+        if not party[0]:
+            raise APIError({"code": "55000", "message": "party_locked"})
+
+        cursor = conn.execute(
+            f"INSERT INTO participants (id, party_id, name, email) VALUES ({ph}, {ph}, {ph}, {ph}) RETURNING *",
+            [str(uuid.uuid4()), p_party_id, p_name, p_email],
+        )
+        return _rows(cursor)[0]
+
+    def _import_participants(self, conn, p_party_id, p_participants):
+        ph = self.dialect.placeholder
+        party = conn.execute(f"SELECT status FROM parties WHERE id = {ph}{self.dialect.for_share}", [p_party_id]).fetchone()
+        if party is None:
+            raise APIError({"code": "P0002", "message": "party_not_found"})
+        if not party[0]:
+            raise APIError({"code": "55000", "message": "party_locked"})
+
+        inserted = []
+        values = f"({ph}, {ph}, {ph}, {ph})"
+        for start in range(0, len(p_participants), MAX_PARAMS // 4):
+            chunk = p_participants[start:start + MAX_PARAMS // 4]
+            cursor = conn.execute(
+                f"INSERT INTO participants (id, party_id, name, email) VALUES {', '.join([values] * len(chunk))}"
+                " ON CONFLICT (party_id, email) DO NOTHING RETURNING *",
+                [v for item in chunk for v in (str(uuid.uuid4()), p_party_id, item["name"], item["email"])],
+            )
+            inserted.extend(_rows(cursor))
+        return inserted
+
+    def _lock_party_and_match(self, conn, p_party_id, p_passcode, p_assignments):
+        ph = self.dialect.placeholder
+        party = conn.execute(
+            f"SELECT passcode, status FROM parties WHERE id = {ph}{self.dialect.for_update}", [p_party_id]
+        ).fetchone()
+        if party is None:
+            raise APIError({"code": "P0002", "message": "party_not_found"})
+        if str(party[0]) != p_passcode:
+            raise APIError({"code": "28P01", "message": "invalid_passcode"})
+        if not party[1]:
+            raise APIError({"code": "55000", "message": "party_locked"})
+
+        members = {str(row[0]) for row in conn.execute(f"SELECT id FROM participants WHERE party_id = {ph}", [p_party_id])}
+        givers = {a["id"] for a in p_assignments}
+        giftees = {a["giftee_id"] for a in p_assignments}
+        if givers != members or not giftees <= members or len(p_assignments) != len(members):
+            raise APIError({"code": "40001", "message": "participants_changed"})
+
+        conn.cursor().executemany(
+            f"UPDATE participants SET giftee_id = {ph} WHERE id = {ph}",
+            [(a["giftee_id"], a["id"]) for a in p_assignments],
+        )
+        conn.execute(f"UPDATE parties SET status = {ph} WHERE id = {ph}", [False, p_party_id])
+        return None
@@ -1,5 +1,9 @@
-from supabase import create_client, Client
+import asyncio
+
+import httpx
+from supabase import create_client, acreate_client, Client, AsyncClientOptions
 from app.core.config import settings
+from app.db.instrument import InstrumentedClient
 
 url: str = settings.SUPABASE_URL
 key: str = settings.SUPABASE_KEY
@@ -7,4 +11,44 @@ key: str = settings.SUPABASE_KEY
 if not url or not key:
     raise ValueError("Supabase URL and Key must be set in environment variables. Please check your .env file.")
 
+# Blocking client for background threads (email outbox workers) and scripts
 supabase: Client = create_client(url, key)
+
+
+class BoundedAsyncClient(httpx.AsyncClient):
+    """
+    httpx client that lets at most `max_in_flight` requests run at once.
+
+    httpcore rescans its whole wait queue every time a connection frees up, so
+    with hundreds of concurrent API requests the pool itself becomes the
+    bottleneck. Waiting on a semaphore in front of it keeps that queue short.
+    """
+
+    def __init__(self, max_in_flight: int, **kwargs):
+        super().__init__(**kwargs)
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def send(self, request, **kwargs):
+        async with self._slots:
+            return await super().send(request, **kwargs)
+
+
+_async_supabase: InstrumentedClient | None = None
+_async_supabase_lock = asyncio.Lock()
+
+
+async def get_async_supabase() -> InstrumentedClient:
+    """
+    Shared async client used by the API routes (as a FastAPI dependency).
+    Created on first use, since acreate_client has to be awaited. The lock
+    keeps simultaneous first requests from each building a client (and an
+    HTTP pool of their own, beyond DB_MAX_IN_FLIGHT).
+    """
+    global _async_supabase
+    if _async_supabase is None:
+        async with _async_supabase_lock:
+            if _async_supabase is None:
+                http = BoundedAsyncClient(settings.DB_MAX_IN_FLIGHT, timeout=120, follow_redirects=True)
+                client = await acreate_client(url, key, options=AsyncClientOptions(httpx_client=http))
+                _async_supabase = InstrumentedClient(client)
+    return _async_supabase
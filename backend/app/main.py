@@ -1,8 +1,36 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import party, participant
+from app.db.parties import party_cache
+from app.db.instrument import start_query_stats
+from app.db.repository import close_db
+from app.utils.email import close_transport
+from app.utils.email_queue import dispatcher
+from app.utils.live import hub
+from app.utils.metrics import registry
 
-app = FastAPI(title="Secret Santa API")
+HTTP_REQUEST_SECONDS = registry.histogram("http_request_duration_seconds", "Time to response headers, by route template.", ["method", "route", "status"])
+HTTP_IN_PROGRESS = registry.gauge("http_requests_in_progress", "Requests being handled.")
+registry.gauge("live_watchers", "Open live event streams.", read=lambda: hub.stats()["watchers"])
+registry.gauge("party_cache_entries", "Party rows cached in this process.", read=lambda: len(party_cache))
+registry.counter("party_cache_hits_total", "Party lookups served from the cache.", read=lambda: party_cache.hits)
+registry.counter("party_cache_misses_total", "Party lookups that went to the database.", read=lambda: party_cache.misses)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    dispatcher.start()
+    yield
+    # Flush queued emails, then log out of any pooled SMTP sessions
+    dispatcher.stop()
+    close_transport()
+    close_db()
+
+
+app = FastAPI(title="Secret Santa API", lifespan=lifespan)
 
 # Enable CORS so your Frontend can talk to this Backend
 origins = [
@@ -17,8 +45,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],  # Conditional GETs, participant list paging
 )
 
+@app.middleware("http")
+async def time_db_calls(request: Request, call_next):
+    """Reports the DB calls each request made (Server-Timing header + log line) and records route latency."""
+    stats = start_query_stats()
+    HTTP_IN_PROGRESS.inc()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        # Unhandled error: the server answers 500, so count it as one
+        _observe_request(request, start, 500)
+        raise
+    finally:
+        HTTP_IN_PROGRESS.dec()
+    _observe_request(request, start, response.status_code)
+    if stats.count:
+        response.headers["Server-Timing"] = stats.server_timing()
+        labels = ", ".join(label for label, _ in stats.calls)
+        print(f"🗄️  {request.method} {request.url.path}: {stats.count} DB calls, {stats.seconds * 1000:.1f} ms ({labels})")
+    return response
+
+
+def _observe_request(request: Request, start: float, status_code: int):
+    # Label by route template (not the raw path) so party ids don't explode the series count
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, getattr(route, "path", "unmatched"), str(status_code))
+
+
 # Register routers
 app.include_router(party.router)
 app.include_router(participant.router)
@@ -27,3 +84,15 @@ app.include_router(participant.router)
 @app.get("/")
 def read_root():
     return {"message": "Secret Santa API is running!"}
+
+
+@app.get("/stats")
+def read_stats():
+    """Cache hit/miss counters and live watchers for this process."""
+    return {"party_cache": party_cache.stats(), "live": hub.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Prometheus metrics for this process (text exposition format)."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -18,11 +18,24 @@ class ResendMyMatch(BaseModel):
 
 class ParticipantUpdate(BaseModel):
     """Schema for updating a participant (admin only)"""
-    passcode: str
+    passcode: Optional[str] = None
     new_email: Optional[EmailStr] = None
     new_name: Optional[str] = None
 
 
+class ParticipantImportRow(BaseModel):
+    """One person in a bulk import (validated per row, not up front)"""
+    name: str = ""
+    email: str = ""
+
+
+class ParticipantImport(BaseModel):
+    """Schema for bulk-adding participants (admin only): a JSON list or CSV text"""
+    passcode: Optional[str] = None
+    participants: Optional[List[ParticipantImportRow]] = None
+    csv: Optional[str] = None  # Header row with "name" and "email" columns
+
+
 # --- Response Schemas ---
 
 class ParticipantPublic(BaseModel):
@@ -36,3 +49,18 @@ class ParticipantPrivate(BaseModel):
     id: UUID
     name: str
     email: EmailStr
+
+
+class ImportRowResult(BaseModel):
+    """Outcome of one imported row"""
+    row: int  # 1-based position in the input (CSV data rows, excluding the header)
+    email: str
+    status: str  # "added", "invalid", "duplicate" (repeated in the input) or "exists" (already in the party)
+    detail: Optional[str] = None
+
+
+class ParticipantImportResponse(BaseModel):
+    """Schema returned by a bulk import"""
+    added: int
+    skipped: int
+    rows: List[ImportRowResult]
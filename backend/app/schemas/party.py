@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import date, time
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 
 # --- Request Schemas ---
@@ -20,13 +20,13 @@ class PartyCreate(BaseModel):
 
 
 class PartyAdminAction(BaseModel):
-    """Schema for actions requiring the master passcode"""
-    passcode: str
+    """Schema for actions requiring the master passcode (or an admin token)"""
+    passcode: Optional[str] = None  # Not needed with Authorization: Bearer <token>
 
 
 class PartyUpdate(BaseModel):
     """Schema for updating party details (admin only)"""
-    passcode: str
+    passcode: Optional[str] = None
     name: Optional[str] = None
     description: Optional[str] = None
     budget: Optional[int] = None
@@ -55,3 +55,40 @@ class PartyCreatedResponse(BaseModel):
     id: str
     passcode: str  # Only shown once at creation time
     name: str
+
+
+class AdminSessionResponse(BaseModel):
+    """Schema returned by admin login"""
+    token: str  # Send as Authorization: Bearer <token>
+    expires_at: int  # Unix time
+
+
+class EmailStatusResponse(BaseModel):
+    """Schema for background email delivery progress of a party"""
+    party_id: str
+    queued: int
+    sent: int
+    failed: int
+
+
+class DashboardParticipant(BaseModel):
+    """A participant as the organizer sees them (never who they drew)"""
+    id: str
+    name: str
+    email: str
+    matched: bool
+
+
+class MatchStatus(BaseModel):
+    """Schema for matching progress of a party"""
+    locked: bool
+    participants: int
+    matched: int
+
+
+class DashboardResponse(BaseModel):
+    """Schema for everything the organizer view shows, in one response"""
+    party: PartyResponse
+    participants: List[DashboardParticipant]
+    match: MatchStatus
+    emails: EmailStatusResponse
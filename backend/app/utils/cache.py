@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire `ttl` seconds after they
+    were stored. Counts hits and misses so callers can see how many lookups
+    it saved.
+
+    A reader that fills the cache from a slow source takes generation()
+    first and passes it to set(); if the key was invalidated in between the
+    value is already stale and is dropped instead of stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        if maxsize < 1 or ttl <= 0:
+            raise ValueError("Cache needs a size of at least 1 and a positive TTL.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._generation = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()  # key -> generation of its last invalidate
+        self._forgotten = 0  # Newest generation dropped from _invalidated (or cleared)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """Stores the value, unless `key` was invalidated after `generation` was taken."""
+        with self._lock:
+            if generation is not None and self._invalidated.get(key, self._forgotten) > generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)  # Least recently used
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generation += 1
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            if len(self._invalidated) > self.maxsize:
+                _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidated.clear()
+            self._forgotten = self._generation
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,48 +1,77 @@
-import smtplib
-import ssl
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
+from app.utils.templates import Template
+from app.utils.metrics import registry
+from app.utils.transports import create_transport
+
+EMAIL_SEND_SECONDS = registry.histogram(
+    "email_send_duration_seconds", "Time to hand one email to the transport, including rate-limit waits.", ["transport", "outcome"]
+)
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Returns the shared email transport (settings.EMAIL_TRANSPORT), creating it on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = create_transport()
+        return _transport
+
+
+def close_transport():
+    """Closes the shared transport (e.g. logs out of pooled SMTP sessions)."""
+    global _transport
+    with _transport_lock:
+        transport, _transport = _transport, None
+    if transport is not None:
+        transport.close()
+
 
 def send_email(to_email: str, subject: str, body_html: str):
     """
-    Sends an HTML email using SMTP (Gmail).
+    Sends an HTML email through the configured transport (pooled SMTP by default).
+    Safe to call from many threads: with SMTP at most SMTP_POOL_SIZE sends run
+    at once and SMTP_RATE_PER_MINUTE is respected.
     """
     sender_email = settings.EMAIL_SENDER
     password = settings.EMAIL_PASSWORD
     
-    if not sender_email or not password:
+    if settings.EMAIL_TRANSPORT == "smtp" and (not sender_email or not password):
         print(f"⚠️ Email credentials not set. Would have sent email to {to_email}")
         return False
 
     msg = MIMEMultipart()
-    msg['From'] = f"Secret Santa Matcher <{sender_email}>"
+    msg['From'] = f"Secret Santa Matcher <{sender_email or 'secret-santa@localhost'}>"
     msg['To'] = to_email
     msg['Subject'] = subject
 
     msg.attach(MIMEText(body_html, 'html'))
 
+    transport = get_transport()
+    start = time.perf_counter()
     try:
-        # Connect to Gmail SMTP (standard)
-        context = ssl.create_default_context()
-        # Switch to port 587 with STARTTLS
-        with smtplib.SMTP('smtp.gmail.com', 587) as server:
-            server.starttls(context=context)
-            server.login(sender_email, password)
-            server.send_message(msg)
-        print(f"✅ Email sent to {to_email}")
+        transport.send(msg)
+        EMAIL_SEND_SECONDS.observe(time.perf_counter() - start, transport.name, "sent")
+        if not transport.quiet:
+            print(f"✅ Email sent to {to_email}")
         return True
     except Exception as e:
+        EMAIL_SEND_SECONDS.observe(time.perf_counter() - start, transport.name, "failed")
         print(f"❌ Failed to send email to {to_email}: {e}")
         return False
 
-def send_match_email(participant, giftee_name, giftee_email, party_details):
-    """
-    Formats and sends the Secret Santa match email.
-    """
-    subject = f"Your Secret Santa Match for {party_details['name']}!"
-    
-    template = """<!DOCTYPE html>
+
+# -----------------------------------------------------------
+#  EMAIL TEMPLATES (parsed once at import)
+# -----------------------------------------------------------
+
+MATCH_EMAIL_HTML = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
@@ -142,28 +171,8 @@ def send_match_email(participant, giftee_name, giftee_email, party_details):
     </div>
 </body>
 </html>"""
-        
-    html = template.format(
-        participant_name=participant['name'],
-        giftee_name=giftee_name,
-        giftee_email=giftee_email,
-        party_name=party_details['name'],
-        party_date=party_details['event_date'],
-        party_time=str(party_details['event_time'])[:5],
-        party_budget=party_details['budget'],
-        party_currency=party_details['currency'],
-        party_description=party_details.get('description', '')
-    )
-    
-    return send_email(participant['email'], subject, html)
-
-def send_host_email(host, party_details, room_code, room_link):
-    """
-    Sends the host their unique room code + room link.
-    """
-    subject = f"Your Secret Santa Room Is Ready, {host['name']}!"
 
-    template = """<!DOCTYPE html>
+HOST_EMAIL_HTML = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
@@ -273,7 +282,61 @@ def send_host_email(host, party_details, room_code, room_link):
 </body>
 </html>"""
 
-    html = template.format(
+MATCH_TEMPLATE = Template(MATCH_EMAIL_HTML)
+HOST_TEMPLATE = Template(HOST_EMAIL_HTML)
+
+
+def prepare_match_email(party_details):
+    """
+    Renders the party-level parts of the match email once (details table,
+    description, footer) and returns a builder for individual recipients:
+    build(participant, giftee_name, giftee_email) -> (to_email, subject, body_html).
+    """
+    subject = f"Your Secret Santa Match for {party_details['name']}!"
+    
+    party_template = MATCH_TEMPLATE.partial(
+        party_name=party_details['name'],
+        party_date=party_details['event_date'],
+        party_time=str(party_details['event_time'])[:5],
+        party_budget=party_details['budget'],
+        party_currency=party_details['currency'],
+        party_description=party_details.get('description', '')
+    )
+
+    def build(participant, giftee_name, giftee_email):
+        html = party_template.render(
+            participant_name=participant['name'],
+            giftee_name=giftee_name,
+            giftee_email=giftee_email,
+        )
+        return participant['email'], subject, html
+
+    return build
+
+
+def build_match_email(participant, giftee_name, giftee_email, party_details):
+    """
+    Formats the Secret Santa match email.
+    Returns (to_email, subject, body_html).
+    """
+    return prepare_match_email(party_details)(participant, giftee_name, giftee_email)
+
+
+def send_match_email(participant, giftee_name, giftee_email, party_details):
+    """
+    Formats and sends the Secret Santa match email.
+    """
+    return send_email(*build_match_email(participant, giftee_name, giftee_email, party_details))
+
+
+def build_host_email(host, party_details, room_code, room_link):
+    """
+    Formats the host email with their unique room code + room link.
+    Returns (to_email, subject, body_html).
+    """
+    subject = f"Your Secret Santa Room Is Ready, {host['name']}!"
+
+    html = HOST_TEMPLATE.render(
         host_name=host['name'],
         party_name=party_details['name'],
         party_date=party_details['event_date'],
@@ -284,5 +347,11 @@ def send_host_email(host, party_details, room_code, room_link):
         room_link=room_link
     )
 
+    return host['email'], subject, html
+
 
-    return send_email(host['email'], subject, html)
+def send_host_email(host, party_details, room_code, room_link):
+    """
+    Sends the host their unique room code + room link.
+    """
+    return send_email(*build_host_email(host, party_details, room_code, room_link))
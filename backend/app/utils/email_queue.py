@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import Dict, List
+
+from app.core.config import settings
+from app.utils import email as email_service
+from app.utils.metrics import registry
+from app.utils.outbox import Email, create_outbox
+
+# Longest wait between retries of one email
+MAX_RETRY_DELAY_SECONDS = 3600
+
+EMAIL_JOBS = registry.counter("email_jobs_total", "Outbox delivery attempts by result (sent, retry, failed = gave up).", ["outcome"])
+
+
+class EmailDispatcher:
+    """
+    Background email delivery backed by an outbox (see app.utils.outbox).
+    Routes enqueue rendered emails and return immediately; worker threads
+    claim due jobs, send them through email.send_email, and reschedule
+    failures with exponential backoff until EMAIL_MAX_ATTEMPTS is reached.
+    """
+
+    def __init__(self, outbox=None, workers: int = 2):
+        self._outbox = outbox
+        self._outbox_lock = threading.Lock()
+        self.workers = workers
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wake = threading.Condition()
+        self._work_added = False
+        self._stopping = False
+
+    @property
+    def outbox(self):
+        """The outbox, created on first use: importing the app opens no spool file or connection."""
+        if self._outbox is None:
+            with self._outbox_lock:
+                if self._outbox is None:
+                    self._outbox = create_outbox()
+        return self._outbox
+
+    def unfinished(self) -> int:
+        """Emails waiting or being sent (0 while the outbox has not been used yet)."""
+        return self._outbox.unfinished() if self._outbox is not None else 0
+
+    def start(self):
+        """Starts the worker threads (no-op if already running)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"email-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 30.0):
+        """Sends whatever is due now, then stops. Later retries stay in the outbox."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        for thread in threads:
+            thread.join(timeout)
+
+    def join(self, poll: float = 0.01):
+        """Blocks until every queued email has been sent or has permanently failed."""
+        while self.outbox.unfinished():
+            time.sleep(poll)
+
+    def enqueue(self, party_id: str, to_email: str, subject: str, body_html: str):
+        """Queues one email for background delivery."""
+        self.enqueue_many(party_id, [(to_email, subject, body_html)])
+
+    def enqueue_many(self, party_id: str, emails: List[Email]):
+        """Queues a batch of (to_email, subject, body_html) in one outbox write."""
+        if not emails:
+            return
+        self.outbox.add_many(party_id, emails)
+        self.start()
+        with self._wake:
+            self._work_added = True
+            self._wake.notify_all()
+
+    def status(self, party_id: str) -> Dict[str, int]:
+        """Returns queued/sent/failed counts for a party."""
+        return self.outbox.counts(party_id)
+
+    def _idle(self):
+        """Sleeps until new work arrives or the next retry is due. Returns False when stopping."""
+        with self._wake:
+            if self._stopping:
+                return False
+            if self._work_added:
+                self._work_added = False
+                return True
+            wait = settings.EMAIL_OUTBOX_POLL_SECONDS
+            due_in = self.outbox.next_due_in()
+            if due_in is not None:
+                wait = min(wait, due_in)
+            self._wake.wait(wait)
+        return True
+
+    def _work(self):
+        while True:
+            try:
+                job = self.outbox.claim()
+            except Exception as e:
+                print(f"❌ Email outbox unavailable: {e}")
+                job = None
+            if job is None:
+                if not self._idle():
+                    return
+                continue
+            self._deliver(job)
+
+    def _deliver(self, job):
+        try:
+            sent = email_service.send_email(job["to_email"], job["subject"], job["body_html"])
+        except Exception as e:
+            print(f"❌ Email worker crashed sending to {job['to_email']}: {e}")
+            sent = False
+
+        try:
+            if sent:
+                self.outbox.mark_sent(job)
+                EMAIL_JOBS.inc("sent")
+            elif job["attempts"] + 1 >= settings.EMAIL_MAX_ATTEMPTS:
+                print(f"❌ Giving up on email to {job['to_email']} after {job['attempts'] + 1} attempts")
+                self.outbox.mark_failed(job)
+                EMAIL_JOBS.inc("failed")
+            else:
+                delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** job["attempts"], MAX_RETRY_DELAY_SECONDS)
+                self.outbox.mark_retry(job, time.time() + delay)
+                EMAIL_JOBS.inc("retry")
+        except Exception as e:
+            # The claim lease expires and the job is picked up again
+            print(f"❌ Could not update outbox for {job['to_email']}: {e}")
+
+
+dispatcher = EmailDispatcher(workers=settings.EMAIL_WORKERS)
+
+registry.gauge("email_outbox_unfinished", "Emails waiting to be sent or being sent.", read=dispatcher.unfinished)
@@ -0,0 +1,18 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+
+def make_etag(data: Any) -> str:
+    """Strong ETag for a JSON-serializable value: a digest of its canonical JSON."""
+    body = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.blake2b(body.encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header lists `etag` (weak comparison, as RFC 9110 asks for GETs)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
@@ -0,0 +1,102 @@
+import asyncio
+import json
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set
+
+from app.core.config import settings
+
+# Sent instead of a watcher's backlog once it falls LIVE_QUEUE_SIZE events behind
+RESYNC = "event: resync\ndata: {}\n\n"
+
+
+def format_event(event: str, data: Dict[str, Any]) -> str:
+    """One Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class TooManyWatchers(Exception):
+    pass
+
+
+class Subscription:
+    """
+    Pending messages for one watcher. Holds at most `size`; if the watcher
+    reads too slowly the backlog is dropped for a single resync message,
+    so a stalled connection never costs more than that.
+    """
+
+    def __init__(self, party_id: str, size: int):
+        self.party_id = party_id
+        self.size = size
+        self._pending: Deque[str] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, message: str):
+        if len(self._pending) >= self.size:
+            self._pending.clear()
+            message = RESYNC
+        self._pending.append(message)
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """Waits up to `timeout` seconds for the next message (None on timeout)."""
+        if not self._pending:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._pending.popleft()
+
+
+class PartyEventHub:
+    """
+    In-process pub/sub: routes publish party events, every watcher of that
+    party gets a copy. Each message is formatted once and shared by all
+    subscribers. Only watchers on this worker see this worker's events.
+
+    Publish and subscribe from the event loop (i.e. from async routes).
+    """
+
+    def __init__(self, queue_size: int, max_watchers: int):
+        self.queue_size = queue_size
+        self.max_watchers = max_watchers
+        self._parties: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+
+    @property
+    def full(self) -> bool:
+        return self._count >= self.max_watchers
+
+    def subscribe(self, party_id: str) -> Subscription:
+        if self.full:
+            raise TooManyWatchers(f"{self._count} watchers connected")
+        subscription = Subscription(party_id, self.queue_size)
+        self._parties.setdefault(party_id, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        watchers = self._parties.get(subscription.party_id)
+        if watchers is None or subscription not in watchers:
+            return
+        watchers.remove(subscription)
+        self._count -= 1
+        if not watchers:
+            del self._parties[subscription.party_id]
+
+    def publish(self, party_id: str, event: str, data: Dict[str, Any]) -> int:
+        """Sends an event to every watcher of the party. Returns how many got it."""
+        watchers = self._parties.get(party_id)
+        if not watchers:
+            return 0
+        message = format_event(event, data)
+        for subscription in watchers:
+            subscription.push(message)
+        return len(watchers)
+
+    def stats(self) -> Dict[str, int]:
+        return {"watchers": self._count, "parties": len(self._parties)}
+
+
+hub = PartyEventHub(settings.LIVE_QUEUE_SIZE, settings.LIVE_MAX_WATCHERS)
@@ -1,31 +1,128 @@
 import random
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
-def generate_matches(participants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Supported matching modes
+UNIFORM = "uniform"            # Every valid derangement is equally likely
+SINGLE_CYCLE = "single-cycle"  # Everyone forms one big gift-giving circle
+MATCHING_MODES = (UNIFORM, SINGLE_CYCLE)
+
+
+def _two_cycle_probabilities(n: int) -> List[float]:
+    """
+    For each size m <= n, the probability that the element removed from a
+    uniformly random derangement of m elements sits in a 2-cycle:
+    (m-1) * D(m-2) / D(m) = 1 / (1 + D(m-1) / D(m-2)).
+
+    The ratio D(m-1) / D(m-2) is carried forward as a float so we never
+    touch the (huge) derangement numbers themselves.
+    """
+    probs = [0.0] * (n + 1)
+    if n >= 2:
+        probs[2] = 1.0  # D(1) = 0, so two people can only swap
+    # probs[3] stays 0.0: D(1) = 0, so three people always form a 3-cycle
+    ratio = 2.0  # D(3) / D(2)
+    for m in range(4, n + 1):
+        if m > 4:
+            ratio = (m - 2) * (1.0 + 1.0 / ratio)
+        probs[m] = 1.0 / (1.0 + ratio)
+    return probs
+
+
+def _uniform_derangement(n: int) -> List[int]:
+    """
+    Uniform random derangement of range(n) in a single O(n) pass, no retries.
+
+    Peels one element at a time: it either closes a 2-cycle with a random
+    partner (leaving a derangement of m-2) or is spliced into a cycle of a
+    derangement of m-1. Choosing between the two with the exact probability
+    above keeps every derangement equally likely.
+    """
+    probs = _two_cycle_probabilities(n)
+    remaining = list(range(n))
+    steps = []
+
+    while remaining:
+        m = len(remaining)
+        x = remaining.pop()
+        if random.random() < probs[m]:
+            j = random.randrange(m - 1)
+            partner = remaining[j]
+            remaining[j] = remaining[-1]
+            remaining.pop()
+            steps.append((x, partner))
+        else:
+            steps.append((x, None))
+
+    # Replay the steps bottom-up to build the permutation
+    perm = [0] * n
+    placed = []
+    for x, partner in reversed(steps):
+        if partner is not None:
+            perm[x] = partner
+            perm[partner] = x
+            placed.append(x)
+            placed.append(partner)
+        else:
+            k = placed[random.randrange(len(placed))]
+            perm[x] = perm[k]
+            perm[k] = x
+            placed.append(x)
+
+    return perm
+
+
+def _single_cycle(n: int) -> List[int]:
+    """Sattolo's algorithm: a uniform random n-cycle of range(n) in O(n)."""
+    perm = list(range(n))
+    for i in range(n - 1, 0, -1):
+        j = random.randrange(i)
+        perm[i], perm[j] = perm[j], perm[i]
+    return perm
+
+
+def generate_matches(participants: List[Dict[str, Any]], mode: str = UNIFORM) -> List[Dict[str, Any]]:
     """
     Takes a list of participants (must have 'id').
     Returns a list of update dictionaries: [{'id': giver_id, 'giftee_id': receiver_id}]
     Ensures no one is assigned themselves.
+
+    mode="uniform" picks any valid assignment with equal probability.
+    mode="single-cycle" chains everyone into one circle (no closed pairs/groups).
+    Both run in a single linear pass.
     """
     if len(participants) < 2:
         raise ValueError("Need at least 2 participants to generate matches.")
 
+    if mode == UNIFORM:
+        perm = _uniform_derangement(len(participants))
+    elif mode == SINGLE_CYCLE:
+        perm = _single_cycle(len(participants))
+    else:
+        raise ValueError(f"Unknown matching mode '{mode}'. Expected one of: {', '.join(MATCHING_MODES)}")
+
     ids = [p['id'] for p in participants]
-    givers = ids[:]
-    receivers = ids[:]
-    
-    # Simple derangement shuffle
-    # We shuffle receivers until no index matches the giver at that index
-    while True:
-        random.shuffle(receivers)
-        if all(g != r for g, r in zip(givers, receivers)):
-            break
-            
-    updates = []
-    for giver_id, receiver_id in zip(givers, receivers):
-        updates.append({
-            "id": giver_id,
-            "giftee_id": receiver_id
-        })
-        
-    return updates
+
+    return [
+        {"id": giver_id, "giftee_id": ids[receiver]}
+        for giver_id, receiver in zip(ids, perm)
+    ]
+
+
+def resolve_matches(participants: List[Dict[str, Any]], matches: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Pairs each giver with their giftee's participant row.
+    `matches` are dicts with 'id' and 'giftee_id' (the output of generate_matches,
+    or participant rows that already carry a giftee_id).
+    Givers without a giftee, or whose giftee is not in `participants`, are skipped.
+    Runs in linear time using a single id -> participant index.
+    """
+    by_id = {p['id']: p for p in participants}
+
+    pairs = []
+    for match in matches:
+        giver = by_id.get(match['id'])
+        giftee = by_id.get(match.get('giftee_id'))
+        if giver is not None and giftee is not None:
+            pairs.append((giver, giftee))
+
+    return pairs
@@ -0,0 +1,293 @@
+import heapq
+import itertools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+# A job that was claimed but never marked (worker crashed) is retried after this
+LEASE_SECONDS = 300
+
+# Per-party counters are kept for this many recently active parties (memory outbox)
+MAX_TRACKED_PARTIES = 10_000
+
+# (to_email, subject, body_html), as returned by build_match_email / build_host_email
+Email = Tuple[str, str, str]
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {"queued": 0, "sent": 0, "failed": 0}
+
+
+class MemoryOutbox:
+    """
+    Outbox kept in process memory. Fast, but jobs are lost on restart.
+    Due jobs live in a heap ordered by their next attempt time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._due = []
+        self._ids = itertools.count(1)
+        self._stats = OrderedDict()
+
+    def _counts_for(self, party_id: str) -> Dict[str, int]:
+        stats = self._stats.get(party_id)
+        if stats is None:
+            stats = self._stats[party_id] = _empty_counts()
+            if len(self._stats) > MAX_TRACKED_PARTIES:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(party_id)
+        return stats
+
+    def add_many(self, party_id: str, emails: List[Email]):
+        now = time.time()
+        with self._lock:
+            for to_email, subject, body_html in emails:
+                job_id = next(self._ids)
+                self._jobs[job_id] = {
+                    "id": job_id,
+                    "party_id": party_id,
+                    "to_email": to_email,
+                    "subject": subject,
+                    "body_html": body_html,
+                    "attempts": 0,
+                }
+                heapq.heappush(self._due, (now, job_id))
+            self._counts_for(party_id)["queued"] += len(emails)
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._due and self._due[0][0] <= time.time():
+                _, job_id = heapq.heappop(self._due)
+                return dict(self._jobs[job_id])
+        return None
+
+    def _finish(self, job: Dict[str, Any], outcome: str):
+        with self._lock:
+            self._jobs.pop(job["id"], None)
+            stats = self._stats.get(job["party_id"])
+            if stats is not None:
+                stats["queued"] -= 1
+                stats[outcome] += 1
+
+    def mark_sent(self, job: Dict[str, Any]):
+        self._finish(job, "sent")
+
+    def mark_failed(self, job: Dict[str, Any]):
+        self._finish(job, "failed")
+
+    def mark_retry(self, job: Dict[str, Any], retry_at: float):
+        with self._lock:
+            stored = self._jobs.get(job["id"])
+            if stored is not None:
+                stored["attempts"] = job["attempts"] + 1
+                heapq.heappush(self._due, (retry_at, job["id"]))
+
+    def counts(self, party_id: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats.get(party_id, _empty_counts()))
+
+    def unfinished(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def next_due_in(self) -> Optional[float]:
+        with self._lock:
+            if not self._due:
+                return None
+            return max(0.0, self._due[0][0] - time.time())
+
+
+class SQLiteOutbox:
+    """
+    Outbox spooled to a local SQLite file, for single-node deployments.
+    Survives restarts: anything not yet sent is picked up again.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                party_id TEXT NOT NULL,
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                body_html TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS email_outbox_due ON email_outbox (status, next_attempt_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS email_outbox_party ON email_outbox (party_id, status)")
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front, so two processes can't claim the same row.
+        # Roll back on any error (e.g. "database is locked"), or every later BEGIN would fail.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._conn.execute("COMMIT")
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+    def add_many(self, party_id: str, emails: List[Email]):
+        now = time.time()
+        with self._transaction():
+            self._conn.executemany(
+                "INSERT INTO email_outbox (party_id, to_email, subject, body_html, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                [(party_id, to_email, subject, body_html, now) for to_email, subject, body_html in emails],
+            )
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                """
+                SELECT id, party_id, to_email, subject, body_html, attempts FROM email_outbox
+                WHERE status IN ('pending', 'sending') AND next_attempt_at <= ?
+                ORDER BY next_attempt_at LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE email_outbox SET status = 'sending', next_attempt_at = ? WHERE id = ?",
+                    (now + LEASE_SECONDS, row[0]),
+                )
+
+        if row is None:
+            return None
+        keys = ("id", "party_id", "to_email", "subject", "body_html", "attempts")
+        return dict(zip(keys, row))
+
+    def _execute(self, sql: str, params: tuple):
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def mark_sent(self, job: Dict[str, Any]):
+        # The body is no longer needed once delivered; keep the row for counts
+        self._execute("UPDATE email_outbox SET status = 'sent', body_html = '' WHERE id = ?", (job["id"],))
+
+    def mark_failed(self, job: Dict[str, Any]):
+        self._execute("UPDATE email_outbox SET status = 'failed', attempts = attempts + 1 WHERE id = ?", (job["id"],))
+
+    def mark_retry(self, job: Dict[str, Any], retry_at: float):
+        self._execute(
+            "UPDATE email_outbox SET status = 'pending', attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+            (retry_at, job["id"]),
+        )
+
+    def counts(self, party_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM email_outbox WHERE party_id = ? GROUP BY status", (party_id,)
+            ).fetchall()
+        return _tally(rows)
+
+    def unfinished(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM email_outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+
+    def next_due_in(self) -> Optional[float]:
+        with self._lock:
+            due = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM email_outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+        return None if due is None else max(0.0, due - time.time())
+
+
+class SupabaseOutbox:
+    """
+    Outbox stored in the `email_outbox` Supabase table (see supabase/migrations).
+    Safe to share between several API instances: claims use SKIP LOCKED.
+    """
+
+    def __init__(self):
+        from app.db.supabase import supabase
+        self._db = supabase
+
+    def add_many(self, party_id: str, emails: List[Email]):
+        from app.db.bulk import chunked
+
+        rows = [
+            {"party_id": party_id, "to_email": to_email, "subject": subject, "body_html": body_html}
+            for to_email, subject, body_html in emails
+        ]
+        for batch in chunked(rows, settings.DB_BATCH_SIZE):
+            self._db.table("email_outbox").insert(batch).execute()
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        response = self._db.rpc("claim_email_outbox", {"p_lease_seconds": LEASE_SECONDS}).execute()
+        return response.data[0] if response.data else None
+
+    def mark_sent(self, job: Dict[str, Any]):
+        self._db.table("email_outbox").update({"status": "sent", "body_html": ""}).eq("id", job["id"]).execute()
+
+    def mark_failed(self, job: Dict[str, Any]):
+        self._db.table("email_outbox").update({"status": "failed", "attempts": job["attempts"] + 1}).eq("id", job["id"]).execute()
+
+    def mark_retry(self, job: Dict[str, Any], retry_at: float):
+        self._db.table("email_outbox").update({
+            "status": "pending",
+            "attempts": job["attempts"] + 1,
+            "next_attempt_at": datetime.fromtimestamp(retry_at, tz=timezone.utc).isoformat(),
+        }).eq("id", job["id"]).execute()
+
+    def counts(self, party_id: str) -> Dict[str, int]:
+        response = self._db.table("email_outbox").select("status").eq("party_id", party_id).execute()
+        statuses = {}
+        for row in response.data:
+            statuses[row["status"]] = statuses.get(row["status"], 0) + 1
+        return _tally(statuses.items())
+
+    def unfinished(self) -> int:
+        response = (
+            self._db.table("email_outbox")
+            .select("id", count="exact", head=True)
+            .in_("status", ["pending", "sending"])
+            .execute()
+        )
+        return response.count or 0
+
+    def next_due_in(self) -> Optional[float]:
+        return None  # Unknown without a round-trip; the dispatcher polls instead
+
+
+def _tally(rows) -> Dict[str, int]:
+    counts = _empty_counts()
+    for status, count in rows:
+        if status in ("pending", "sending"):
+            counts["queued"] += count
+        elif status in counts:
+            counts[status] += count
+    return counts
+
+
+def create_outbox():
+    """Builds the outbox selected by settings.EMAIL_OUTBOX."""
+    if settings.EMAIL_OUTBOX == "memory":
+        return MemoryOutbox()
+    if settings.EMAIL_OUTBOX == "sqlite":
+        return SQLiteOutbox(settings.EMAIL_OUTBOX_PATH)
+    if settings.EMAIL_OUTBOX == "supabase":
+        return SupabaseOutbox()
+    raise ValueError(f"Unknown EMAIL_OUTBOX '{settings.EMAIL_OUTBOX}'. Expected memory, sqlite or supabase.")
@@ -0,0 +1,50 @@
+import csv
+import io
+from typing import Any, Dict, List, Set, Tuple
+
+from email_validator import EmailNotValidError, validate_email
+
+# Largest import accepted in one request
+MAX_IMPORT_ROWS = 10_000
+
+ADDED, INVALID, DUPLICATE, EXISTS = "added", "invalid", "duplicate", "exists"
+
+
+def parse_csv(text: str) -> List[Dict[str, str]]:
+    """Reads CSV with a header row containing `name` and `email` (any case, any order)."""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))  # Excel adds a BOM
+    columns = {(field or "").strip().lower(): field for field in reader.fieldnames or []}
+    if "name" not in columns or "email" not in columns:
+        raise ValueError("CSV needs a header row with 'name' and 'email' columns.")
+    name, email = columns["name"], columns["email"]
+    return [{"name": row.get(name) or "", "email": row.get(email) or ""} for row in reader]
+
+
+def check_rows(rows: List[Dict[str, str]], existing: Set[str]) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]]]:
+    """
+    Validates and de-duplicates import rows in one pass.
+    Returns the rows to insert (with normalized emails) and a report entry per
+    input row; rows to insert are reported "added" and can be downgraded later.
+    """
+    seen: Set[str] = set()
+    to_insert, report = [], []
+    for index, row in enumerate(rows, start=1):
+        name, raw_email = row["name"].strip(), row["email"].strip()
+        entry = {"row": index, "email": raw_email, "status": ADDED, "detail": None}
+        report.append(entry)
+        try:
+            email = validate_email(raw_email, check_deliverability=False).normalized
+        except EmailNotValidError as e:
+            entry.update(status=INVALID, detail=str(e))
+            continue
+        entry["email"] = email
+        if not name:
+            entry.update(status=INVALID, detail="Name is required.")
+        elif email in existing:
+            entry["status"] = EXISTS
+        elif email in seen:
+            entry["status"] = DUPLICATE
+        else:
+            seen.add(email)
+            to_insert.append({"name": name, "email": email, "row": index})
+    return to_insert, report
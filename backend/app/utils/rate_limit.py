@@ -0,0 +1,31 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills `rate` tokens per second and holds at
+    most `capacity`, so short bursts go out at once and sustained traffic is
+    held to the average rate.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Token bucket needs a positive rate and a capacity of at least 1.")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping until it is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token even if it isn't there yet; callers queue up in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
@@ -0,0 +1,90 @@
+import smtplib
+import ssl
+import threading
+from email.message import Message
+
+
+def _session_dropped(error: Exception) -> bool:
+    """True if the error means the SMTP session is gone and a fresh one may succeed."""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError)):
+        return True
+    # 421: the server is closing the transmission channel (idle timeout, too many messages)
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code == 421
+
+
+class SMTPPool:
+    """
+    Keeps up to `size` authenticated SMTP sessions open and reuses them for
+    many messages, so a fan-out of N emails costs `size` handshakes instead of N.
+    A session the server has dropped is replaced transparently on the next send.
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 size: int = 3, use_tls: bool = True, timeout: float = 30.0):
+        if size < 1:
+            raise ValueError("SMTP pool size must be at least 1.")
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls(context=ssl.create_default_context())
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _checkin(self, server: smtplib.SMTP):
+        with self._lock:
+            self._idle.append(server)
+
+    def send(self, msg: Message):
+        """Sends a message over a pooled session. Raises on failure like smtplib does."""
+        with self._slots:
+            server = self._checkout()
+            try:
+                server.send_message(msg)
+            except Exception as e:
+                self._close(server)
+                if not _session_dropped(e):
+                    raise
+                # Stale session: reconnect once and retry
+                server = self._connect()
+                try:
+                    server.send_message(msg)
+                except Exception:
+                    self._close(server)
+                    raise
+            self._checkin(server)
+
+    def close(self):
+        """Closes every idle session (e.g. on shutdown)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            self._close(server)
@@ -0,0 +1,73 @@
+from string import Formatter
+from typing import List, Tuple, Any
+
+
+class Template:
+    """
+    A str.format-style template parsed once into literal chunks and named slots.
+
+    `partial()` fills some slots up front (e.g. the party details shared by every
+    recipient) and returns a smaller template, so each `render()` only joins a
+    handful of pieces instead of re-scanning the whole document.
+    """
+
+    def __init__(self, source: str):
+        parts: List[Tuple[str, str, str]] = []  # (literal, field, format_spec)
+        for literal, field, format_spec, conversion in Formatter().parse(source):
+            if conversion:
+                raise ValueError(f"Conversions are not supported in templates: {{{field}!{conversion}}}")
+            parts.append((literal, field, format_spec or ""))
+        self._compile(parts)
+
+    @classmethod
+    def _from_parts(cls, parts: List[Tuple[str, str, str]]) -> "Template":
+        template = cls.__new__(cls)
+        template._compile(parts)
+        return template
+
+    def _compile(self, parts: List[Tuple[str, str, str]]):
+        # Merge runs of literal text so render() joins as few pieces as possible
+        merged: List[Tuple[str, str, str]] = []
+        pending = ""
+        for literal, field, format_spec in parts:
+            pending += literal
+            if field is not None:
+                merged.append((pending, field, format_spec))
+                pending = ""
+        self._parts = merged
+        self._tail = pending
+
+        self._chunks: List[str] = []
+        self._slots: List[Tuple[int, str, str]] = []
+        for literal, field, format_spec in merged:
+            self._chunks.append(literal)
+            self._slots.append((len(self._chunks), field, format_spec))
+            self._chunks.append("")
+        self._chunks.append(pending)
+
+    @property
+    def fields(self) -> List[str]:
+        return [field for _, field, _ in self._slots]
+
+    def partial(self, **values: Any) -> "Template":
+        """Returns a new template with the given slots filled in."""
+        parts = []
+        carry = ""
+        for literal, field, format_spec in self._parts:
+            if field in values:
+                carry += literal + format(values[field], format_spec)
+            else:
+                parts.append((carry + literal, field, format_spec))
+                carry = ""
+        parts.append((carry + self._tail, None, ""))
+        return Template._from_parts(parts)
+
+    def render(self, **values: Any) -> str:
+        """Fills every remaining slot and returns the finished text."""
+        chunks = self._chunks[:]
+        for index, field, format_spec in self._slots:
+            chunks[index] = format(values[field], format_spec)
+        return "".join(chunks)
+
+    def __repr__(self) -> str:
+        return f"Template(fields={self.fields})"
@@ -0,0 +1,96 @@
+import mailbox
+import threading
+from email.message import Message
+from typing import List
+
+from app.core.config import settings
+from app.utils.rate_limit import TokenBucket
+from app.utils.smtp_pool import SMTPPool
+
+
+class SMTPTransport:
+    """Delivers through pooled SMTP sessions, paced by the provider rate limit."""
+
+    name = "smtp"
+    quiet = False
+
+    def __init__(self):
+        self.pool = SMTPPool(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.EMAIL_SENDER,
+            settings.EMAIL_PASSWORD,
+            size=settings.SMTP_POOL_SIZE,
+            use_tls=settings.SMTP_USE_TLS,
+        )
+        self.limiter = None
+        if settings.SMTP_RATE_PER_MINUTE > 0:
+            self.limiter = TokenBucket(settings.SMTP_RATE_PER_MINUTE / 60, settings.SMTP_BURST)
+
+    def send(self, msg: Message):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self.pool.send(msg)
+
+    def close(self):
+        self.pool.close()
+
+
+class MemoryTransport:
+    """Keeps every message in a list. For tests and offline load runs."""
+
+    name = "memory"
+    quiet = True  # Skip the per-email log line
+
+    def __init__(self):
+        self.messages: List[Message] = []
+        self._lock = threading.Lock()
+
+    def send(self, msg: Message):
+        with self._lock:
+            self.messages.append(msg)
+
+    def close(self):
+        pass
+
+
+class MaildirTransport:
+    """Writes each message as a file into a local Maildir (readable by any mail client)."""
+
+    name = "maildir"
+    quiet = False
+
+    def __init__(self, path: str):
+        self.maildir = mailbox.Maildir(path, create=True)
+
+    def send(self, msg: Message):
+        self.maildir.add(msg)
+
+    def close(self):
+        pass
+
+
+class NullTransport:
+    """Accepts and discards everything. Measures the app without any delivery cost."""
+
+    name = "null"
+    quiet = True  # Skip the per-email log line
+
+    def send(self, msg: Message):
+        pass
+
+    def close(self):
+        pass
+
+
+def create_transport():
+    """Builds the transport selected by settings.EMAIL_TRANSPORT."""
+    if settings.EMAIL_TRANSPORT == "smtp":
+        return SMTPTransport()
+    if settings.EMAIL_TRANSPORT == "memory":
+        return MemoryTransport()
+    if settings.EMAIL_TRANSPORT == "maildir":
+        return MaildirTransport(settings.EMAIL_MAILDIR)
+    if settings.EMAIL_TRANSPORT == "null":
+        return NullTransport()
+    raise ValueError(f"Unknown EMAIL_TRANSPORT '{settings.EMAIL_TRANSPORT}'. Expected smtp, memory, maildir or null.")
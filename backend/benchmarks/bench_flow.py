@@ -0,0 +1,100 @@
+"""
+Full party lifecycle through the HTTP API with no network:
+create -> join x N -> lock -> resend, on the in-memory DB backend.
+
+Run from the backend directory:
+    python -m benchmarks.bench_flow [participants] [concurrency]
+
+Requests go through the real FastAPI app (routing, validation, cache,
+DB instrumentation) via httpx's ASGI transport. The DB is the in-memory
+backend and emails go to the memory transport, so the numbers measure the
+application itself and run the same on a laptop or a CI runner.
+"""
+import asyncio
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+os.environ.setdefault("DB_BACKEND", "memory")  # or "sql" with DATABASE_URL
+os.environ["EMAIL_TRANSPORT"] = "memory"
+os.environ["EMAIL_OUTBOX"] = "memory"
+
+import httpx
+
+from app.main import app
+from app.utils.email import get_transport
+from app.utils.email_queue import dispatcher
+
+PARTICIPANTS = 2000
+CONCURRENCY = 50
+PARTY_ID = "BENCH1"
+ADMIN = {"passcode": None}
+
+
+def db_calls(response):
+    match = re.search(r'db;desc="(\d+) queries"', response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+async def timed(label, requests, concurrency, rows):
+    """Runs the request coroutines `concurrency` at a time and adds one result row."""
+    slots = asyncio.Semaphore(concurrency)
+    calls = 0
+
+    async def run(make_request):
+        nonlocal calls
+        async with slots:
+            response = await make_request()
+            response.raise_for_status()
+            calls += db_calls(response)
+            return response
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(run(r) for r in requests))
+    elapsed = time.perf_counter() - start
+    rows.append(f"{label:<10}{len(requests):>10}{elapsed:>10.3f}{len(requests) / elapsed:>10.0f}{calls:>10}")
+    return responses
+
+
+async def run_flow(participants, concurrency, rows):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        party = {
+            "id": PARTY_ID, "name": "Office Party", "currency": "USD", "event_date": "2025-12-20",
+            "event_time": "18:00:00", "organizer_name": "Host", "organizer_email": "host@example.com",
+        }
+        [created] = await timed("create", [lambda: http.post("/api/party", json=party)], 1, rows)
+        ADMIN["passcode"] = created.json()["passcode"]
+
+        await timed("join", [
+            lambda i=i: http.post(f"/api/party/{PARTY_ID}/participants", json={"name": f"Guest {i}", "email": f"guest{i}@example.com"})
+            for i in range(participants)
+        ], concurrency, rows)
+        await timed("lock", [lambda: http.post(f"/api/party/{PARTY_ID}/lock", json=ADMIN)], 1, rows)
+        await timed("resend", [lambda: http.post(f"/api/party/{PARTY_ID}/resend", json=ADMIN)], 1, rows)
+
+
+def run_benchmark(participants=PARTICIPANTS, concurrency=CONCURRENCY):
+    rows = [f"{'step':<10}{'requests':>10}{'seconds':>10}{'req/s':>10}{'db calls':>10}"]
+    dispatcher.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Drop the per-request log lines
+        asyncio.run(run_flow(participants, concurrency, rows))
+        dispatcher.join()
+    elapsed = time.perf_counter() - start
+    dispatcher.stop()
+    print("\n".join(rows))
+    print(f"total {elapsed:.2f}s, {len(get_transport().messages)} emails delivered")
+
+
+if __name__ == "__main__":
+    participants = int(sys.argv[1]) if len(sys.argv) > 1 else PARTICIPANTS
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else CONCURRENCY
+    run_benchmark(participants, concurrency)
@@ -0,0 +1,44 @@
+"""
+Benchmark for the matching engine.
+
+Run from the backend directory:
+    python -m benchmarks.bench_matching
+
+Prints the total time and the cost per participant for each mode. With a
+linear engine the per-participant column should stay flat from 2 people
+all the way to 1,000,000.
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.matching import generate_matches, MATCHING_MODES
+
+SIZES = [2, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def time_matching(n, mode, repeat):
+    participants = [{"id": i} for i in range(n)]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        generate_matches(participants, mode=mode)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sizes=SIZES):
+    print(f"{'mode':<14}{'participants':>14}{'total (ms)':>14}{'per person (ns)':>18}")
+    for mode in MATCHING_MODES:
+        for n in sizes:
+            # Small sizes are noisy, so take the best of more runs
+            repeat = max(3, min(2000, 200_000 // n))
+            elapsed = time_matching(n, mode, repeat)
+            print(f"{mode:<14}{n:>14,}{elapsed * 1e3:>14.3f}{elapsed / n * 1e9:>18.1f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
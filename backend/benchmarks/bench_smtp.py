@@ -0,0 +1,93 @@
+"""
+SMTP throughput benchmark: one connection per message vs. the pooled transport
+vs. the full background dispatcher (parallel workers over the pool).
+
+Run from the backend directory:
+    python -m benchmarks.bench_smtp
+
+All variants talk to a local stand-in server. Each EHLO/AUTH step sleeps
+HANDSHAKE_DELAY to mimic the TLS + login cost of a real provider, which is
+what the pool saves.
+"""
+import smtplib
+import sys
+import threading
+import time
+from email.mime.text import MIMEText
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.utils import email
+from app.utils.email_queue import EmailDispatcher
+from app.utils.outbox import MemoryOutbox
+from app.utils.smtp_pool import SMTPPool
+from benchmarks.smtp_server import LocalSMTPServer
+
+MESSAGES = 200
+HANDSHAKE_DELAY = 0.01  # seconds per EHLO / AUTH round
+POOL_SIZE = 3
+
+
+def make_message(i):
+    msg = MIMEText(f"<p>Your match is Guest {i}</p>", "html")
+    msg["From"] = "Secret Santa Matcher <santa@example.com>"
+    msg["To"] = f"guest{i}@example.com"
+    msg["Subject"] = "Your Secret Santa Match"
+    return msg
+
+
+def send_per_connection(port, messages):
+    """The old behaviour: connect, login and quit for every message."""
+    for msg in messages:
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.login("santa@example.com", "password")
+            server.send_message(msg)
+
+
+def send_pooled(port, messages):
+    pool = SMTPPool("127.0.0.1", port, "santa@example.com", "password", size=POOL_SIZE, use_tls=False)
+    chunks = [messages[i::POOL_SIZE] for i in range(POOL_SIZE)]
+    threads = [threading.Thread(target=lambda c=c: [pool.send(m) for m in c]) for c in chunks]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    pool.close()
+
+
+def send_dispatched(port, messages):
+    """Lock/resend path: enqueue everything, let EMAIL_WORKERS threads drain it."""
+    settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_USE_TLS = "127.0.0.1", port, False
+    settings.EMAIL_SENDER, settings.EMAIL_PASSWORD = "santa@example.com", "password"
+    settings.SMTP_POOL_SIZE, settings.SMTP_RATE_PER_MINUTE = POOL_SIZE, 0
+    email.close_transport()
+
+    queue = EmailDispatcher(outbox=MemoryOutbox(), workers=POOL_SIZE)
+    queue.enqueue_many("BENCH1", [(m["To"], m["Subject"], m.get_payload()) for m in messages])
+    queue.join()
+    queue.stop()
+    email.close_transport()
+
+
+def run_benchmark():
+    messages = [make_message(i) for i in range(MESSAGES)]
+    print(f"{'transport':<24}{'messages':>10}{'connections':>13}{'seconds':>10}{'msg/s':>10}")
+
+    variants = (
+        ("connection per email", send_per_connection),
+        (f"pool (size {POOL_SIZE})", send_pooled),
+        (f"dispatcher ({POOL_SIZE} workers)", send_dispatched),
+    )
+    for label, sender in variants:
+        with LocalSMTPServer(handshake_delay=HANDSHAKE_DELAY) as server:
+            start = time.perf_counter()
+            sender(server.port, messages)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<24}{server.messages:>10}{server.connections:>13}{elapsed:>10.2f}{server.messages / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for rendering match emails.
+
+Run from the backend directory:
+    python -m benchmarks.bench_templates
+
+Compares the cost per recipient of formatting the whole ~6 KB document with
+str.format against the precompiled template with the party fragment
+rendered once per lock.
+"""
+import sys
+import timeit
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.utils.email import MATCH_EMAIL_HTML, prepare_match_email
+
+RECIPIENTS = 10_000
+
+PARTY = {
+    "name": "Office Party",
+    "event_date": "2025-12-20",
+    "event_time": "18:00:00+00:00",
+    "budget": 25,
+    "currency": "USD",
+    "description": "Bring snacks and good cheer.",
+}
+PARTICIPANT = {"name": "Ana", "email": "ana@example.com"}
+
+
+def full_format():
+    return MATCH_EMAIL_HTML.format(
+        participant_name=PARTICIPANT["name"],
+        giftee_name="Ben",
+        giftee_email="ben@example.com",
+        party_name=PARTY["name"],
+        party_date=PARTY["event_date"],
+        party_time=str(PARTY["event_time"])[:5],
+        party_budget=PARTY["budget"],
+        party_currency=PARTY["currency"],
+        party_description=PARTY["description"],
+    )
+
+
+def run_benchmark():
+    build = prepare_match_email(PARTY)
+
+    variants = (
+        ("str.format per recipient", full_format),
+        ("precompiled + party fragment", lambda: build(PARTICIPANT, "Ben", "ben@example.com")),
+    )
+    print(f"{'renderer':<32}{'per recipient (us)':>20}")
+    for label, render in variants:
+        best = min(timeit.repeat(render, number=RECIPIENTS, repeat=5))
+        print(f"{label:<32}{best / RECIPIENTS * 1e6:>20.2f}")
+
+    prepare = min(timeit.repeat(lambda: prepare_match_email(PARTY), number=1000, repeat=5))
+    print(f"{'party fragment (once per lock)':<32}{prepare / 1000 * 1e6:>20.2f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
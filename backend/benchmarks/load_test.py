@@ -0,0 +1,145 @@
+"""
+HTTP load test for the read endpoints under many concurrent clients.
+
+Run from the backend directory:
+    python -m benchmarks.load_test [clients] [requests_per_client]
+
+Starts a stand-in PostgREST server that answers every query after DB_LATENCY
+seconds (the round trip to Supabase, LOAD_TEST_DB_LATENCY to override), points the API at it, serves the API
+with uvicorn (each in its own process, so the load generator does not share
+a GIL with the server under test) and hammers GET /api/party/{id} and GET /api/party/{id}/participants
+from `clients` concurrent connections. Reports requests/sec and latency
+percentiles. Run it on two commits to compare (e.g. sync vs. async routes).
+"""
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+CLIENTS = 500
+REQUESTS_PER_CLIENT = 10
+DB_LATENCY = float(os.getenv("LOAD_TEST_DB_LATENCY", "0.1"))  # seconds per PostgREST round trip
+PARTY_ID = "LOAD01"
+
+PARTY = {
+    "id": PARTY_ID,
+    "passcode": "secret",
+    "name": "Load Test Party",
+    "description": "",
+    "budget": 25,
+    "currency": "USD",
+    "event_date": "2025-12-20",
+    "event_time": "18:00:00+00:00",
+    "organizer_name": "Host",
+    "organizer_email": "host@example.com",
+    "status": True,
+}
+PARTICIPANTS = [
+    {"id": str(uuid.UUID(int=i + 1)), "party_id": PARTY_ID, "name": f"Guest {i}", "email": f"guest{i}@example.com", "giftee_id": None}
+    for i in range(20)
+]
+
+
+async def postgrest(request):
+    await asyncio.sleep(DB_LATENCY)
+    rows = PARTICIPANTS if request.path_params["table"] == "participants" else [PARTY]
+    return JSONResponse(rows)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_postgrest(port):
+    app = Starlette(routes=[Route("/rest/v1/{table}", postgrest)])
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096, timeout_keep_alive=60)
+
+
+def serve_api(port, db_port):
+    # The Supabase clients are created from settings on import, so point them first
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{db_port}"
+    os.environ.setdefault("SUPABASE_KEY", "load-test-key")
+    os.environ["EMAIL_TRANSPORT"] = "null"
+    from app.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096, timeout_keep_alive=60)
+
+
+def start(target, *args):
+    """Runs a server in a child process and waits until its port accepts connections."""
+    process = multiprocessing.Process(target=target, args=args, daemon=True)
+    process.start()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", args[0]), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+
+
+async def get(reader, writer, path):
+    """One keep-alive HTTP/1.1 GET. Hand-rolled so the load generator stays cheaper than the server."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: loadtest\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = int(head.lower().split(b"content-length:", 1)[1].split(b"\r\n", 1)[0])
+    await reader.readexactly(length)
+    if status != 200:
+        raise RuntimeError(f"GET {path} returned {status}")
+
+
+async def client_loop(port, paths, count, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for i in range(count):
+            start = time.perf_counter()
+            await get(reader, writer, paths[i % len(paths)])
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def hammer(port, clients, per_client):
+    paths = [f"/api/party/{PARTY_ID}", f"/api/party/{PARTY_ID}/participants"]
+    latencies = []
+    await client_loop(port, paths, 2, [])  # warm up (creates the Supabase client)
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(port, paths, per_client, latencies) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    return elapsed, sorted(latencies)
+
+
+def run_load_test(clients=CLIENTS, per_client=REQUESTS_PER_CLIENT):
+    db_port, api_port = free_port(), free_port()
+    servers = [start(serve_postgrest, db_port), start(serve_api, api_port, db_port)]
+    try:
+        elapsed, latencies = asyncio.run(hammer(api_port, clients, per_client))
+    finally:
+        for process in servers:
+            process.terminate()
+
+    total = len(latencies)
+    p50 = latencies[total // 2] * 1000
+    p99 = latencies[int(total * 0.99)] * 1000
+    print(f"{'clients':>8}{'requests':>10}{'seconds':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"{clients:>8}{total:>10}{elapsed:>10.2f}{total / elapsed:>10.0f}{p50:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else CLIENTS
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else REQUESTS_PER_CLIENT
+    run_load_test(clients, per_client)
@@ -0,0 +1,92 @@
+"""
+Minimal local SMTP stand-in (in the spirit of aiosmtpd's debugging server).
+
+Speaks just enough ESMTP for smtplib: EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT,
+DATA, RSET, NOOP and QUIT. It accepts everything, counts connections and
+messages, and can simulate a slow handshake (TLS + login on a real provider)
+or a server that drops sessions after a number of messages.
+"""
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.stats_lock:
+            server.connections += 1
+
+        self.reply("220 localhost ESMTP stand-in")
+        sent_on_session = 0
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                time.sleep(server.handshake_delay)
+                self.reply("250-localhost")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 8BITMIME")
+            elif verb == "AUTH":
+                time.sleep(server.handshake_delay)
+                if command.upper().startswith("AUTH LOGIN"):
+                    # Username and password prompts
+                    self.reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self.reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                self.reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                with server.stats_lock:
+                    server.messages += 1
+                self.reply("250 OK: queued")
+                sent_on_session += 1
+                if server.max_messages_per_session and sent_on_session >= server.max_messages_per_session:
+                    return  # Hang up without warning, like an idle timeout
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Threaded SMTP stand-in on 127.0.0.1. Use as a context manager."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay: float = 0.0, max_messages_per_session: int = 0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.handshake_delay = handshake_delay
+        self.max_messages_per_session = max_messages_per_session
+        self.stats_lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
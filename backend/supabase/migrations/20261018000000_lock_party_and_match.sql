@@ -0,0 +1,62 @@
+-- Atomically verify, assign and lock a party in a single round-trip.
+--
+-- Called by POST /api/party/{id}/lock through supabase.rpc(...).
+-- p_assignments is a JSON array of {"id": <giver uuid>, "giftee_id": <giftee uuid>}
+-- and must cover exactly the party's current participants.
+--
+-- Errors (mapped to HTTP responses by the API):
+--   P0002 party_not_found       -> 404
+--   28P01 invalid_passcode      -> 403
+--   55000 party_locked          -> 400
+--   40001 participants_changed  -> 409 (someone joined/left while matching)
+
+create or replace function public.lock_party_and_match(
+    p_party_id text,
+    p_passcode text,
+    p_assignments jsonb
+)
+returns void
+language plpgsql
+as $$
+declare
+    v_party public.parties;
+    v_expected integer;
+    v_valid integer;
+begin
+    -- Row lock: a concurrent lock call blocks here, then sees status = false
+    select * into v_party from public.parties where id = p_party_id for update;
+
+    if not found then
+        raise exception 'party_not_found' using errcode = 'P0002';
+    end if;
+
+    if v_party.passcode::text <> p_passcode then
+        raise exception 'invalid_passcode' using errcode = '28P01';
+    end if;
+
+    if not v_party.status then
+        raise exception 'party_locked' using errcode = '55000';
+    end if;
+
+    select count(*) into v_expected
+      from public.participants
+     where party_id = p_party_id;
+
+    select count(distinct a.id) into v_valid
+      from jsonb_to_recordset(p_assignments) as a(id uuid, giftee_id uuid)
+      join public.participants giver on giver.id = a.id and giver.party_id = p_party_id
+      join public.participants giftee on giftee.id = a.giftee_id and giftee.party_id = p_party_id
+     where a.id <> a.giftee_id;
+
+    if v_valid <> v_expected or jsonb_array_length(p_assignments) <> v_expected then
+        raise exception 'participants_changed' using errcode = '40001';
+    end if;
+
+    update public.participants p
+       set giftee_id = a.giftee_id
+      from jsonb_to_recordset(p_assignments) as a(id uuid, giftee_id uuid)
+     where p.id = a.id;
+
+    update public.parties set status = false where id = p_party_id;
+end;
+$$;
@@ -0,0 +1,47 @@
+-- Durable outbox for match and host emails (used when EMAIL_OUTBOX=supabase).
+--
+-- Rows are inserted by the API and delivered by its background workers.
+-- Failed sends go back to 'pending' with an exponentially later
+-- next_attempt_at; a 'sending' row whose lease expired (worker crashed)
+-- is claimed again.
+
+create table if not exists public.email_outbox (
+    id bigint generated always as identity primary key,
+    party_id text not null references public.parties (id) on delete cascade,
+    to_email text not null,
+    subject text not null,
+    body_html text not null,
+    status text not null default 'pending'
+        check (status in ('pending', 'sending', 'sent', 'failed')),
+    attempts integer not null default 0,
+    next_attempt_at timestamptz not null default now(),
+    created_at timestamptz not null default now()
+);
+
+create index if not exists email_outbox_due
+    on public.email_outbox (next_attempt_at)
+    where status in ('pending', 'sending');
+
+create index if not exists email_outbox_party
+    on public.email_outbox (party_id, status);
+
+-- Claims the next due email and leases it for p_lease_seconds.
+-- SKIP LOCKED lets several API instances drain the outbox without collisions.
+create or replace function public.claim_email_outbox(p_lease_seconds integer default 300)
+returns setof public.email_outbox
+language sql
+as $$
+    update public.email_outbox o
+       set status = 'sending',
+           next_attempt_at = now() + make_interval(secs => p_lease_seconds)
+     where o.id = (
+            select id
+              from public.email_outbox
+             where status in ('pending', 'sending')
+               and next_attempt_at <= now()
+             order by next_attempt_at
+             for update skip locked
+             limit 1
+           )
+    returning o.*;
+$$;
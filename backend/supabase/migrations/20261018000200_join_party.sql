@@ -0,0 +1,50 @@
+-- One participant per email per party, enforced by the database instead of
+-- a check-then-insert in the API (two simultaneous joins used to both pass).
+--
+-- Remove existing duplicates before applying, e.g.:
+--   delete from public.participants a using public.participants b
+--   where a.party_id = b.party_id and a.email = b.email and a.created_at > b.created_at;
+
+create unique index if not exists participants_party_email
+    on public.participants (party_id, email);
+
+-- Join an open party in a single round-trip.
+--
+-- Called by POST /api/party/{id}/participants through supabase.rpc(...).
+-- Returns the new participants row.
+--
+-- Errors (mapped to HTTP responses by the API):
+--   P0002 party_not_found  -> 404
+--   55000 party_locked     -> 400
+--   23505 unique_violation -> 400 (email already registered)
+
+create or replace function public.join_party(
+    p_party_id text,
+    p_name text,
+    p_email text
+)
+returns public.participants
+language plpgsql
+as $$
+declare
+    v_status boolean;
+    v_participant public.participants;
+begin
+    -- Shared row lock: joins run side by side, but wait for (and then see) a lock in progress
+    select status into v_status from public.parties where id = p_party_id for share;
+
+    if not found then
+        raise exception 'party_not_found' using errcode = 'P0002';
+    end if;
+
+    if not v_status then
+        raise exception 'party_locked' using errcode = '55000';
+    end if;
+
+    insert into public.participants (party_id, name, email)
+    values (p_party_id, p_name, p_email)
+    returning * into v_participant;
+
+    return v_participant;
+end;
+$$;
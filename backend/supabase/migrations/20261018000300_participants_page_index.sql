@@ -0,0 +1,8 @@
+-- Keyset pagination for participant lists.
+--
+-- GET /api/party/{id}/participants?limit=&after= reads
+--   where party_id = $1 and id > $2 order by id limit $3
+-- which this index answers without sorting the whole party.
+
+create index if not exists participants_party_id
+    on public.participants (party_id, id);
@@ -0,0 +1,43 @@
+-- Add many participants to an open party in one transaction.
+--
+-- Called by POST /api/party/{id}/participants/import through supabase.rpc(...).
+-- p_participants is a JSON array of {"name": ..., "email": ...}. Emails already
+-- registered for the party (including ones joined while the import ran) are
+-- skipped. Returns the inserted participants rows.
+--
+-- Errors (mapped to HTTP responses by the API):
+--   P0002 party_not_found -> 404
+--   55000 party_locked    -> 400
+
+create or replace function public.import_participants(
+    p_party_id text,
+    p_participants jsonb
+)
+returns setof public.participants
+language plpgsql
+as $$
+declare
+    v_status boolean;
+begin
+    -- Same shared row lock as join_party: a lock in progress waits for the import, or the import sees it
+    select status into v_status from public.parties where id = p_party_id for share;
+
+    if not found then
+        raise exception 'party_not_found' using errcode = 'P0002';
+    end if;
+
+    if not v_status then
+        raise exception 'party_locked' using errcode = '55000';
+    end if;
+
+    return query
+        with inserted as (
+            insert into public.participants (party_id, name, email)
+            select p_party_id, p ->> 'name', p ->> 'email'
+            from jsonb_array_elements(p_participants) as p
+            on conflict (party_id, email) do nothing
+            returning *
+        )
+        select * from inserted;
+end;
+$$;
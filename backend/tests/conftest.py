@@ -0,0 +1,115 @@
+import os
+import re
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The Supabase client refuses to import without settings; offline tests swap it
+# out for FakeSupabase below, so placeholder values are enough here.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "offline-test-key")
+os.environ.setdefault("SECRET_KEY", "offline-test-secret")
+os.environ.setdefault("EMAIL_OUTBOX", "memory")  # No spool file in the working directory
+
+from app.db.memory import MemoryClient
+
+
+class FakeSupabase(MemoryClient):
+    """MemoryClient that records every query, with helpers to seed rows."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def log(self, target, action):
+        self.calls.append((target, action))
+
+    def add_party(self, party_id="TEST01", passcode="secret", **fields):
+        party = {
+            "id": party_id,
+            "passcode": passcode,
+            "name": "Office Party",
+            "description": "Bring snacks",
+            "budget": 25,
+            "currency": "USD",
+            "event_date": "2025-12-20",
+            "event_time": "18:00:00+00:00",
+            "organizer_name": "Host",
+            "organizer_email": "host@example.com",
+            "status": True,
+        }
+        party.update(fields)
+        self.tables["parties"][party_id] = party
+        return party
+
+    def add_participants(self, party_id, count):
+        rows = [
+            {"id": str(uuid.uuid4()), "party_id": party_id, "name": f"Guest {i}", "email": f"guest{i}@example.com", "giftee_id": None}
+            for i in range(count)
+        ]
+        for row in rows:
+            self.tables["participants"][row["id"]] = row
+        return rows
+
+
+@pytest.fixture
+def fake_db():
+    """Serve every route from a fresh FakeSupabase."""
+    from app.main import app
+    from app.db.instrument import InstrumentedClient
+    from app.db.repository import get_db
+    from app.db.parties import party_cache
+    from app.db.participants import participant_list_etags
+
+    party_cache.clear()
+    participant_list_etags.clear()
+    db = FakeSupabase()
+    app.dependency_overrides[get_db] = lambda: InstrumentedClient(db)
+    yield db
+    app.dependency_overrides.pop(get_db, None)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "query_budget(n): fail if any request in the test makes more than n DB calls")
+
+
+def _enforce_query_budget(budget):
+    def check(response):
+        match = re.search(r'db;desc="(\d+) queries"', response.headers.get("server-timing", ""))
+        calls = int(match.group(1)) if match else 0
+        if calls > budget:
+            pytest.fail(f"{response.request.method} {response.request.url.path} made {calls} DB calls (query budget {budget})")
+    return check
+
+
+@pytest.fixture
+def client(request):
+    """TestClient for the app. Honours @pytest.mark.query_budget(n)."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    marker = request.node.get_closest_marker("query_budget")
+    if marker is not None:
+        client.event_hooks = {"response": [_enforce_query_budget(marker.args[0])]}
+    return client
+
+
+@pytest.fixture
+def sent_emails(monkeypatch):
+    """Capture outgoing emails instead of talking to SMTP."""
+    from app.utils import email
+
+    outbox = []
+
+    def capture(to_email, subject, body_html):
+        outbox.append((to_email, subject))
+        return True
+
+    monkeypatch.setattr(email, "send_email", capture)
+    return outbox
@@ -0,0 +1,86 @@
+import pytest
+
+from app.core.config import settings
+from app.core.security import issue_admin_token, verify_admin_token
+
+ADMIN = {"passcode": "secret"}
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def login(client, party_id):
+    response = client.post(f"/api/party/{party_id}/admin/login", json=ADMIN)
+    assert response.status_code == 200
+    return response.json()["token"]
+
+
+def test_token_is_scoped_signed_and_short_lived():
+    token, expires_at = issue_admin_token("SESS01", now=1000)
+    assert expires_at == 1000 + settings.ADMIN_TOKEN_TTL_SECONDS
+
+    assert verify_admin_token(token, "SESS01", now=1001)
+    assert not verify_admin_token(token, "SESS02", now=1001)
+    assert not verify_admin_token(token, "SESS01", now=expires_at)
+    payload, signature = token.split(".")
+    assert not verify_admin_token(f"{payload}.{signature[:-2]}AA", "SESS01", now=1001)
+    assert not verify_admin_token("garbage", "SESS01", now=1001)
+
+
+def test_login_needs_the_passcode(fake_db, client):
+    fake_db.add_party("SESS03")
+
+    assert client.post("/api/party/SESS03/admin/login", json={"passcode": "wrong"}).status_code == 403
+    assert client.post("/api/party/NOPE00/admin/login", json=ADMIN).status_code == 404
+
+
+def test_token_cannot_renew_itself(fake_db, client):
+    fake_db.add_party("SESS09")
+    token = login(client, "SESS09")
+
+    assert client.post("/api/party/SESS09/admin/login", headers=bearer(token)).status_code == 403
+
+
+def test_login_without_secret_key_is_unavailable(fake_db, client, monkeypatch):
+    fake_db.add_party("SESS04")
+    monkeypatch.setattr(settings, "SECRET_KEY", None)
+
+    assert client.post("/api/party/SESS04/admin/login", json=ADMIN).status_code == 503
+
+
+@pytest.mark.query_budget(1)
+def test_token_skips_the_party_lookup(fake_db, client):
+    fake_db.add_party("SESS05")
+    guest = fake_db.add_participants("SESS05", 2)[0]
+    token = login(client, "SESS05")
+    fake_db.calls.clear()
+
+    listed = client.post("/api/party/SESS05/participants/admin", headers=bearer(token))
+    assert listed.status_code == 200 and len(listed.json()) == 2
+
+    renamed = client.patch(f"/api/party/SESS05/participants/{guest['id']}", json={"new_name": "Renamed"}, headers=bearer(token))
+    assert renamed.json()["name"] == "Renamed"
+
+    assert client.patch("/api/party/SESS05", json={"name": "New name"}, headers=bearer(token)).status_code == 200
+    assert ("parties", "select") not in fake_db.calls
+
+
+def test_token_works_for_lock_and_delete(fake_db, sent_emails, client):
+    fake_db.add_party("SESS06")
+    fake_db.add_participants("SESS06", 3)
+    token = login(client, "SESS06")
+
+    assert client.post("/api/party/SESS06/lock", headers=bearer(token)).status_code == 200
+    assert client.request("DELETE", "/api/party/SESS06", headers=bearer(token)).status_code == 204
+    assert client.request("DELETE", "/api/party/SESS06", headers=bearer(token)).status_code == 404
+
+
+def test_token_for_another_party_is_rejected(fake_db, client):
+    fake_db.add_party("SESS07")
+    fake_db.add_party("SESS08")
+    token = login(client, "SESS07")
+
+    assert client.post("/api/party/SESS08/participants/admin", headers=bearer(token)).status_code == 403
+    assert client.request("DELETE", "/api/party/SESS08", headers=bearer(token)).status_code == 403
+    assert client.post("/api/party/SESS08/lock", headers=bearer(token)).status_code == 403
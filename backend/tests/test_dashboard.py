@@ -0,0 +1,43 @@
+import pytest
+
+from app.utils.email_queue import dispatcher
+
+ADMIN = {"passcode": "secret"}
+
+
+@pytest.mark.query_budget(2)
+def test_dashboard_has_everything_for_the_organizer_view(fake_db, client):
+    fake_db.add_party("DASH01")
+    guests = fake_db.add_participants("DASH01", 3)
+
+    response = client.post("/api/party/DASH01/dashboard", json=ADMIN)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["party"]["name"] == "Office Party" and "passcode" not in body["party"]
+    assert sorted(p["email"] for p in body["participants"]) == sorted(g["email"] for g in guests)
+    assert body["match"] == {"locked": False, "participants": 3, "matched": 0}
+    assert body["emails"] == {"party_id": "DASH01", "queued": 0, "sent": 0, "failed": 0}
+
+
+def test_dashboard_after_matching(fake_db, sent_emails, client):
+    fake_db.add_party("DASH02")
+    fake_db.add_participants("DASH02", 4)
+    client.post("/api/party/DASH02/lock", json=ADMIN)
+    dispatcher.join()
+
+    response = client.post("/api/party/DASH02/dashboard", json=ADMIN)
+    body = response.json()
+
+    assert body["match"] == {"locked": True, "participants": 4, "matched": 4}
+    assert all(p["matched"] for p in body["participants"])
+    assert "giftee_id" not in body["participants"][0]
+    assert body["emails"]["sent"] + body["emails"]["queued"] == 4
+    assert response.headers["server-timing"].startswith('db;desc="2 queries"')  # Party (re-read after the lock) + participants
+
+
+def test_dashboard_needs_admin(fake_db, client):
+    fake_db.add_party("DASH03")
+
+    assert client.post("/api/party/DASH03/dashboard", json={"passcode": "wrong"}).status_code == 403
+    assert client.post("/api/party/NOPE00/dashboard", json=ADMIN).status_code == 404
@@ -0,0 +1,153 @@
+import pytest
+
+from app.core.config import settings
+from app.utils.email_queue import EmailDispatcher, dispatcher
+from app.utils.outbox import MemoryOutbox, SQLiteOutbox
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 3)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def outbox(request, tmp_path):
+    if request.param == "memory":
+        return MemoryOutbox()
+    return SQLiteOutbox(str(tmp_path / "outbox.sqlite3"))
+
+
+def test_dispatcher_counts_sent_and_failed(monkeypatch, fast_retries, outbox):
+    from app.utils import email
+
+    monkeypatch.setattr(email, "send_email", lambda to, subject, body: not to.startswith("bad"))
+    queue = EmailDispatcher(outbox=outbox, workers=3)
+
+    for to in ["a@example.com", "bad@example.com", "b@example.com"]:
+        queue.enqueue("QUEUE1", to, "Hi", "<p>Hi</p>")
+    queue.join()
+
+    assert queue.status("QUEUE1") == {"queued": 0, "sent": 2, "failed": 1}
+    assert queue.status("OTHER1") == {"queued": 0, "sent": 0, "failed": 0}
+    queue.stop()
+
+
+def test_create_party_queues_host_email(fake_db, sent_emails, client):
+    response = client.post("/api/party", json={
+        "id": "HOST01",
+        "name": "Office Party",
+        "currency": "USD",
+        "event_date": "2025-12-20",
+        "event_time": "18:00:00",
+        "organizer_name": "Host",
+        "organizer_email": "host@example.com",
+    })
+    dispatcher.join()
+
+    assert response.status_code == 201
+    assert sent_emails == [("host@example.com", "Your Secret Santa Room Is Ready, Host!")]
+    assert client.get("/api/party/HOST01/emails").json()["sent"] == 1
+
+
+def test_lock_returns_before_emails_are_sent(fake_db, client, monkeypatch):
+    import threading
+    from app.utils import email
+
+    release = threading.Event()
+
+    def slow_send(to, subject, body):
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(email, "send_email", slow_send)
+    fake_db.add_party("SLOW01")
+    fake_db.add_participants("SLOW01", 6)
+
+    client.post("/api/party/SLOW01/lock", json={"passcode": "secret"})
+    assert client.get("/api/party/SLOW01/emails").json()["queued"] == 6
+
+    release.set()
+    dispatcher.join()
+    assert client.get("/api/party/SLOW01/emails").json()["sent"] == 6
+
+
+def test_email_status_of_an_unknown_party_is_404(fake_db, client):
+    assert client.get("/api/party/NOPE00/emails").status_code == 404
+
+
+def test_failed_sends_are_retried_with_backoff(monkeypatch, fast_retries, outbox):
+    from app.utils import email
+
+    attempts = []
+
+    def flaky_send(to, subject, body):
+        attempts.append(to)
+        return len(attempts) >= 3  # SMTP hiccups twice, then recovers
+
+    monkeypatch.setattr(email, "send_email", flaky_send)
+    queue = EmailDispatcher(outbox=outbox, workers=1)
+
+    queue.enqueue("RETRY1", "guest@example.com", "Hi", "<p>Hi</p>")
+    queue.join()
+
+    assert attempts == ["guest@example.com"] * 3
+    assert queue.status("RETRY1") == {"queued": 0, "sent": 1, "failed": 0}
+    queue.stop()
+
+
+def test_sqlite_outbox_survives_restart(tmp_path, sent_emails):
+    path = str(tmp_path / "outbox.sqlite3")
+    SQLiteOutbox(path).add_many("SPOOL1", [("a@example.com", "Hi", "<p>a</p>"), ("b@example.com", "Hi", "<p>b</p>")])
+
+    # A fresh process finds the spooled emails and delivers them
+    queue = EmailDispatcher(outbox=SQLiteOutbox(path), workers=2)
+    queue.start()
+    queue.join()
+
+    assert sorted(to for to, _ in sent_emails) == ["a@example.com", "b@example.com"]
+    assert queue.status("SPOOL1") == {"queued": 0, "sent": 2, "failed": 0}
+    queue.stop()
+
+
+def test_sqlite_claim_rolls_back_a_failed_transaction(tmp_path):
+    import sqlite3
+
+    outbox = SQLiteOutbox(str(tmp_path / "outbox.sqlite3"))
+    outbox.add_many("LOCKED", [("a@example.com", "Hi", "<p>a</p>")])
+    conn = outbox._conn
+
+    class BusyConnection:
+        def execute(self, sql, *params):
+            if sql.lstrip().startswith("SELECT"):
+                raise sqlite3.OperationalError("database is locked")
+            return conn.execute(sql, *params)
+
+        def __getattr__(self, name):
+            return getattr(conn, name)
+
+    outbox._conn = BusyConnection()
+    with pytest.raises(sqlite3.OperationalError):
+        outbox.claim()
+
+    # The failed claim left no transaction open, so the next one works
+    outbox._conn = conn
+    assert outbox.claim()["to_email"] == "a@example.com"
+
+
+def test_outbox_is_created_on_first_use(tmp_path):
+    import os
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    # Importing the app (tests, scripts, load tests) must not drop a spool file in the working directory
+    backend = str(Path(__file__).parent.parent)
+    env = {**os.environ, "EMAIL_OUTBOX": "sqlite", "PYTHONPATH": backend}
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+    queue = EmailDispatcher(workers=1)
+    assert queue.unfinished() == 0 and queue._outbox is None
+    queue.outbox.add_many("LAZY01", [("a@example.com", "Hi", "<p>a</p>")])
+    assert queue.unfinished() == 1
@@ -0,0 +1,101 @@
+import pytest
+
+from app.utils.etag import etag_matches, make_etag
+
+ADMIN = {"passcode": "secret"}
+
+
+def test_etag_matching():
+    etag = make_etag({"b": 1, "a": [1, 2]})
+    assert etag == make_etag({"a": [1, 2], "b": 1})
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches('"other"', etag)
+
+
+@pytest.mark.query_budget(1)
+def test_unchanged_party_is_not_modified(fake_db, client):
+    fake_db.add_party("TAG001")
+    first = client.get("/api/party/TAG001")
+    etag = first.headers["etag"]
+
+    again = client.get("/api/party/TAG001", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag and "server-timing" not in again.headers
+
+    client.patch("/api/party/TAG001", json={"passcode": "secret", "name": "Renamed"})
+    changed = client.get("/api/party/TAG001", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_party_etag_leaves_out_the_passcode(fake_db, client):
+    from app.db.parties import party_cache
+
+    fake_db.add_party("TAG002", passcode="one")
+    etag = client.get("/api/party/TAG002").headers["etag"]
+    fake_db.tables["parties"]["TAG002"]["passcode"] = "two"
+    party_cache.clear()
+
+    assert client.get("/api/party/TAG002").headers["etag"] == etag
+
+
+def test_participant_polls_skip_the_db_until_someone_joins(fake_db, client):
+    fake_db.add_party("TAG004")
+    fake_db.add_participants("TAG004", 3)
+    etag = client.get("/api/party/TAG004/participants").headers["etag"]
+    fake_db.calls.clear()
+
+    for _ in range(5):
+        poll = client.get("/api/party/TAG004/participants", headers={"If-None-Match": etag})
+        assert poll.status_code == 304
+    assert fake_db.calls == []
+
+    client.post("/api/party/TAG004/participants", json={"name": "New", "email": "new@example.com"})
+    poll = client.get("/api/party/TAG004/participants", headers={"If-None-Match": etag})
+    assert poll.status_code == 200 and len(poll.json()) == 4
+    assert poll.headers["etag"] != etag
+
+
+def test_participant_etag_survives_a_cold_cache(fake_db, client):
+    from app.db.participants import participant_list_etags
+
+    fake_db.add_party("TAG005")
+    fake_db.add_participants("TAG005", 2)
+    etag = client.get("/api/party/TAG005/participants").headers["etag"]
+    participant_list_etags.clear()  # e.g. served by another worker
+
+    poll = client.get("/api/party/TAG005/participants", headers={"If-None-Match": etag})
+    assert poll.status_code == 304
+
+
+def test_removal_changes_participant_etag(fake_db, client):
+    fake_db.add_party("TAG006")
+    guest = fake_db.add_participants("TAG006", 2)[0]
+    etag = client.get("/api/party/TAG006/participants").headers["etag"]
+
+    client.request("DELETE", f"/api/party/TAG006/participants/{guest['id']}", json=ADMIN)
+
+    assert client.get("/api/party/TAG006/participants", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_join_during_a_participant_read_is_not_hidden_by_304(fake_db, client, monkeypatch):
+    from app.api.routes import participant
+
+    fake_db.add_party("TAG007")
+    fake_db.add_participants("TAG007", 2)
+    read = participant._participant_list
+
+    async def read_then_join(*args):
+        # The list is read, then a guest joins before the poll caches its ETag
+        listed = await read(*args)
+        monkeypatch.setattr(participant, "_participant_list", read)
+        client.post("/api/party/TAG007/participants", json={"name": "Late", "email": "late@example.com"})
+        return listed
+
+    monkeypatch.setattr(participant, "_participant_list", read_then_join)
+    stale = client.get("/api/party/TAG007/participants")
+    assert len(stale.json()) == 2
+
+    poll = client.get("/api/party/TAG007/participants", headers={"If-None-Match": stale.headers["etag"]})
+    assert poll.status_code == 200 and len(poll.json()) == 3
@@ -0,0 +1,147 @@
+import time
+
+import pytest
+
+ADMIN = "secret"
+
+
+def import_people(client, party_id, **body):
+    return client.post(f"/api/party/{party_id}/participants/import", json={"passcode": ADMIN, **body})
+
+
+def test_json_import_reports_every_row(fake_db, client):
+    fake_db.add_party("IMP001")
+    fake_db.add_participants("IMP001", 1)  # guest0@example.com
+
+    response = import_people(client, "IMP001", participants=[
+        {"name": "Alice", "email": "alice@example.com"},
+        {"name": "Bob", "email": "not-an-email"},
+        {"name": "Alice Again", "email": "alice@example.com"},
+        {"name": "Guest", "email": "guest0@example.com"},
+        {"name": "", "email": "carol@example.com"},
+    ])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["added"], body["skipped"]) == (1, 4)
+    assert [r["status"] for r in body["rows"]] == ["added", "invalid", "duplicate", "exists", "invalid"]
+    assert len(fake_db.tables["participants"]) == 2
+
+
+def test_csv_import(fake_db, client):
+    fake_db.add_party("IMP002")
+    csv = "\ufeffEmail,Name\nalice@example.com,Alice\n bob@example.com , Bob \n"
+
+    body = import_people(client, "IMP002", csv=csv).json()
+
+    assert body["added"] == 2
+    assert sorted((p["name"], p["email"]) for p in fake_db.tables["participants"].values()) == [
+        ("Alice", "alice@example.com"), ("Bob", "bob@example.com"),
+    ]
+
+
+def test_import_rejects_bad_requests(fake_db, client):
+    fake_db.add_party("IMP003")
+    fake_db.add_party("IMP004", status=False)
+
+    wrong = client.post("/api/party/IMP003/participants/import", json={"passcode": "nope", "participants": []})
+    locked = import_people(client, "IMP004", participants=[{"name": "A", "email": "a@example.com"}])
+    no_header = import_people(client, "IMP003", csv="alice@example.com,Alice\n")
+
+    assert wrong.status_code == 403
+    assert locked.status_code == 400
+    assert no_header.status_code == 400
+
+
+@pytest.mark.query_budget(3)
+def test_import_5000_in_one_call(fake_db, client):
+    fake_db.add_party("IMP005")
+    people = [{"name": f"Person {i}", "email": f"person{i}@example.com"} for i in range(5000)]
+
+    start = time.perf_counter()
+    body = import_people(client, "IMP005", participants=people).json()
+    elapsed = time.perf_counter() - start
+
+    assert body["added"] == 5000
+    assert fake_db.calls.count(("rpc", "import_participants")) == 1
+    assert elapsed < 5
+
+
+@pytest.mark.query_budget(13)
+def test_import_5000_in_batches_without_the_rpc(fake_db, client, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DB_BATCH_SIZE", 500)
+    del fake_db.functions["import_participants"]
+    fake_db.add_party("IMP007")
+    people = [{"name": f"Person {i}", "email": f"person{i}@example.com"} for i in range(5000)]
+
+    body = import_people(client, "IMP007", participants=people).json()
+
+    assert body["added"] == 5000
+    assert fake_db.calls.count(("participants", "insert")) == 10
+
+
+def test_import_skips_emails_taken_by_a_concurrent_join(fake_db, client, monkeypatch):
+    from app.api.routes import participant as participant_routes
+
+    fake_db.add_party("IMP006")
+    original = participant_routes.check_rows
+
+    def someone_joins(rows, existing):
+        result = original(rows, existing)
+        fake_db.tables["participants"]["late"] = {"id": "late", "party_id": "IMP006", "name": "Bob", "email": "bob@example.com"}
+        return result
+
+    monkeypatch.setattr(participant_routes, "check_rows", someone_joins)
+
+    body = import_people(client, "IMP006", participants=[
+        {"name": "Alice", "email": "alice@example.com"},
+        {"name": "Bob", "email": "bob@example.com"},
+    ]).json()
+
+    assert body["added"] == 1
+    assert [r["status"] for r in body["rows"]] == ["added", "exists"]
+
+
+def test_import_into_a_party_locked_meanwhile_adds_nobody(fake_db, client, monkeypatch):
+    from app.api.routes import participant as participant_routes
+
+    fake_db.add_party("IMP008")
+    original = participant_routes.check_rows
+
+    def party_gets_locked(rows, existing):
+        # Another worker locks the party after the guard saw it open
+        fake_db.tables["parties"]["IMP008"]["status"] = False
+        return original(rows, existing)
+
+    monkeypatch.setattr(participant_routes, "check_rows", party_gets_locked)
+
+    response = import_people(client, "IMP008", participants=[{"name": "Alice", "email": "alice@example.com"}])
+
+    assert response.status_code == 400
+    assert not fake_db.tables["participants"]
+
+
+def test_import_fallback_retries_until_the_batch_settles(fake_db, client, monkeypatch):
+    del fake_db.functions["import_participants"]
+    fake_db.add_party("IMP009")
+    joiners = iter(["bob@example.com", "carol@example.com"])
+
+    def join_before_each_insert(target, action):
+        # A different guest joins right before each of the first two inserts
+        email = next(joiners, None) if (target, action) == ("participants", "insert") else None
+        if email:
+            fake_db.tables["participants"][email] = {"id": email, "party_id": "IMP009", "name": "Early", "email": email}
+
+    monkeypatch.setattr(fake_db, "log", join_before_each_insert)
+
+    response = import_people(client, "IMP009", participants=[
+        {"name": "Alice", "email": "alice@example.com"},
+        {"name": "Bob", "email": "bob@example.com"},
+        {"name": "Carol", "email": "carol@example.com"},
+    ])
+
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["rows"]] == ["added", "exists", "exists"]
+    assert len(fake_db.tables["participants"]) == 3
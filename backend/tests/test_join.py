@@ -0,0 +1,54 @@
+import pytest
+
+
+def join(client, party_id, email, name="Guest"):
+    return client.post(f"/api/party/{party_id}/participants", json={"name": name, "email": email})
+
+
+@pytest.fixture(params=["rpc", "fallback"])
+def join_db(request, fake_db):
+    if request.param == "fallback":
+        del fake_db.functions["join_party"]  # Unmigrated database
+    return fake_db
+
+
+def test_join_adds_participant(join_db, client):
+    join_db.add_party("JOIN01")
+
+    response = join(client, "JOIN01", "alice@example.com", "Alice")
+
+    assert response.status_code == 201
+    assert response.json()["name"] == "Alice"
+    assert [p["email"] for p in join_db.tables["participants"].values()] == ["alice@example.com"]
+
+
+def test_join_errors_keep_their_messages(join_db, client):
+    join_db.add_party("JOIN02")
+    join_db.add_party("LOCKED", status=False)
+    join(client, "JOIN02", "alice@example.com")
+
+    duplicate = join(client, "JOIN02", "alice@example.com")
+    locked = join(client, "LOCKED", "bob@example.com")
+    missing = join(client, "NOPE00", "bob@example.com")
+
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "This email is already registered for this party."
+    assert locked.status_code == 400
+    assert locked.json()["detail"] == "Party is locked. No new participants allowed."
+    assert missing.status_code == 404
+
+
+def test_join_is_one_db_call(fake_db, client):
+    fake_db.add_party("JOIN03")
+
+    join(client, "JOIN03", "alice@example.com")
+
+    assert fake_db.calls == [("rpc", "join_party")]
+
+
+def test_same_email_in_other_party_is_fine(fake_db, client):
+    fake_db.add_party("JOIN04")
+    fake_db.add_party("JOIN05")
+
+    assert join(client, "JOIN04", "alice@example.com").status_code == 201
+    assert join(client, "JOIN05", "alice@example.com").status_code == 201
@@ -0,0 +1,158 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.utils.live import RESYNC, PartyEventHub, TooManyWatchers, format_event
+
+ADMIN = {"passcode": "secret"}
+
+
+def test_hub_fans_out_to_the_party_only():
+    async def scenario():
+        hub = PartyEventHub(queue_size=8, max_watchers=10)
+        first, second, other = hub.subscribe("P1"), hub.subscribe("P1"), hub.subscribe("P2")
+
+        assert hub.publish("P1", "party_locked", {}) == 2
+        assert await first.next(1) == await second.next(1) == format_event("party_locked", {})
+        assert await other.next(0.01) is None
+
+        hub.unsubscribe(first)
+        hub.unsubscribe(first)
+        assert hub.stats() == {"watchers": 2, "parties": 2}
+
+    asyncio.run(scenario())
+
+
+def test_slow_watcher_is_told_to_resync():
+    async def scenario():
+        hub = PartyEventHub(queue_size=3, max_watchers=10)
+        watcher = hub.subscribe("P1")
+        for i in range(10):
+            hub.publish("P1", "participant_joined", {"id": str(i), "name": "Guest"})
+
+        pending = [await watcher.next(0.01) for _ in range(4)]
+        assert len(watcher._pending) == 0 and pending[-1] is None
+        assert pending[0] == RESYNC
+
+    asyncio.run(scenario())
+
+
+def test_hub_caps_watchers():
+    hub = PartyEventHub(queue_size=3, max_watchers=1)
+    hub.subscribe("P1")
+    assert hub.full
+    with pytest.raises(TooManyWatchers):
+        hub.subscribe("P2")
+
+
+async def read_events(app, path, count):
+    """Opens an SSE stream straight on the ASGI app; returns the first `count` events, then disconnects."""
+    body, done, requested = [], asyncio.Event(), []
+
+    async def receive():
+        if not requested:
+            requested.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            body.append(message["status"])
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b"").decode())
+            if "".join(body[1:]).count("event: ") >= count:
+                done.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"test")], "client": ("test", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return body[0], [block for block in "".join(body[1:]).split("\n\n") if block.startswith("event: ")]
+
+
+def test_party_page_gets_live_participant_events(fake_db, sent_emails):
+    from app.main import app
+    from app.utils.live import hub
+
+    fake_db.add_party("LIVE01")
+    fake_db.add_participants("LIVE01", 2)
+
+    async def scenario():
+        watcher = asyncio.create_task(read_events(app, "/api/party/LIVE01/events", 3))
+        while hub.stats()["watchers"] == 0:
+            await asyncio.sleep(0.01)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            joined = (await http.post("/api/party/LIVE01/participants", json={"name": "Zed", "email": "zed@example.com"})).json()
+            await http.request("DELETE", f"/api/party/LIVE01/participants/{joined['id']}", json=ADMIN)
+            await http.post("/api/party/LIVE01/lock", json=ADMIN)
+
+        status, events = await asyncio.wait_for(watcher, 5)
+        return status, events
+
+    status, events = asyncio.run(scenario())
+
+    assert status == 200
+    assert [e.split("\n")[0] for e in events] == ["event: participant_joined", "event: participant_removed", "event: party_locked"]
+    assert '"name":"Zed"' in events[0] and "email" not in events[0]
+    assert hub.stats()["watchers"] == 0
+
+
+def test_watching_an_unknown_party_is_404(fake_db, client):
+    assert client.get("/api/party/NOPE00/events").status_code == 404
+
+
+def test_watcher_is_subscribed_before_the_stream_starts(fake_db, monkeypatch):
+    from app.api.routes import party as party_routes
+    from app.utils.live import hub
+
+    fake_db.add_party("LIVE02")
+    monkeypatch.setattr(hub, "max_watchers", 1)
+
+    async def scenario():
+        response = await party_routes.watch_party("LIVE02", fake_db.tables["parties"]["LIVE02"])
+
+        # Published after the route returned, before the body is read: still delivered
+        hub.publish("LIVE02", "party_updated", {})
+        with pytest.raises(HTTPException) as second:
+            await party_routes.watch_party("LIVE02", fake_db.tables["parties"]["LIVE02"])
+
+        body = response.body_iterator
+        first = [await body.__anext__(), await body.__anext__()]
+        await body.aclose()
+        hub.unsubscribe(response.subscription)
+        return first, second.value.status_code
+
+    (retry, event), status = asyncio.run(scenario())
+
+    assert retry.startswith("retry:") and event == format_event("party_updated", {})
+    assert status == 503
+    assert hub.stats()["watchers"] == 0
+
+
+def test_stream_ends_when_the_party_is_deleted(fake_db):
+    from app.main import app
+    from app.utils.live import hub
+
+    fake_db.add_party("LIVE03")
+
+    async def scenario():
+        watcher = asyncio.create_task(read_events(app, "/api/party/LIVE03/events", 99))
+        while hub.stats()["watchers"] == 0:
+            await asyncio.sleep(0.01)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            await http.request("DELETE", "/api/party/LIVE03", json=ADMIN)
+
+        return await asyncio.wait_for(watcher, 5)  # Returns without the client hanging up
+
+    status, events = asyncio.run(scenario())
+
+    assert status == 200
+    assert [e.split("\n")[0] for e in events] == ["event: party_deleted"]
+    assert hub.stats()["watchers"] == 0
@@ -0,0 +1,145 @@
+import time
+
+from app.utils.email_queue import dispatcher
+
+# Locking a 50k-person party (matching, DB writes against the fake client,
+# rendering and delivering every email) must stay well inside this budget.
+# The old quadratic lookup alone took minutes at this size.
+LOCK_50K_BUDGET_SECONDS = 10.0
+
+ADMIN = {"passcode": "secret"}
+
+
+def test_lock_assigns_everyone_and_emails_their_giftee(fake_db, sent_emails, client):
+    fake_db.add_party("LOCK01")
+    guests = fake_db.add_participants("LOCK01", 5)
+
+    response = client.post("/api/party/LOCK01/lock", json=ADMIN)
+    dispatcher.join()
+
+    assert response.status_code == 200
+    rows = fake_db.tables["participants"]
+    giftees = [rows[g["id"]]["giftee_id"] for g in guests]
+    assert sorted(giftees) == sorted(g["id"] for g in guests)
+    assert all(rows[g["id"]]["giftee_id"] != g["id"] for g in guests)
+    assert fake_db.tables["parties"]["LOCK01"]["status"] is False
+    assert sorted(to for to, _ in sent_emails) == sorted(g["email"] for g in guests)
+
+
+def test_lock_rejects_wrong_passcode_and_locked_party(fake_db, sent_emails, client):
+    fake_db.add_party("LOCK02")
+    fake_db.add_participants("LOCK02", 3)
+
+    assert client.post("/api/party/LOCK02/lock", json={"passcode": "nope"}).status_code == 403
+    assert client.post("/api/party/LOCK02/lock", json=ADMIN).status_code == 200
+    assert client.post("/api/party/LOCK02/lock", json=ADMIN).status_code == 400
+
+
+def test_resend_reaches_every_matched_participant(fake_db, sent_emails, client):
+    fake_db.add_party("LOCK03")
+    fake_db.add_participants("LOCK03", 4)
+    client.post("/api/party/LOCK03/lock", json=ADMIN)
+    dispatcher.join()
+    sent_emails.clear()
+
+    response = client.post("/api/party/LOCK03/resend", json=ADMIN)
+    dispatcher.join()
+
+    assert response.json() == {"message": "Resending 4 emails."}
+    assert len(sent_emails) == 4
+
+
+def test_lock_50k_party_within_time_budget(fake_db, sent_emails, client):
+    fake_db.add_party("BIG001")
+    fake_db.add_participants("BIG001", 50_000)
+
+    start = time.perf_counter()
+    response = client.post("/api/party/BIG001/lock", json=ADMIN)
+    dispatcher.join()
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    assert len(sent_emails) == 50_000
+    assert elapsed < LOCK_50K_BUDGET_SECONDS, f"Locking 50k participants took {elapsed:.2f}s"
+
+
+def test_lock_without_rpc_updates_each_participant(fake_db, sent_emails, client, monkeypatch, capsys):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DB_BATCH_SIZE", 500)
+    fake_db.functions.clear()  # no lock_party_and_match RPC -> batched fallback path
+    fake_db.add_party("BATCH1")
+    fake_db.add_participants("BATCH1", 1200)
+
+    client.post("/api/party/BATCH1/lock", json=ADMIN)
+
+    writes = [call for call in fake_db.calls if call[0] == "participants" and call[1] != "select"]
+    assert writes == [("participants", "update")] * 1200
+    assert all(row["giftee_id"] for row in fake_db.tables["participants"].values())
+    assert fake_db.tables["parties"]["BATCH1"]["status"] is False
+    assert "lock_party_and_match is missing" in capsys.readouterr().out
+
+
+def test_fallback_lock_does_not_recreate_removed_participants(fake_db, sent_emails, client, monkeypatch):
+    from app.api.routes import party as party_routes
+
+    fake_db.functions.clear()
+    fake_db.add_party("GONE01")
+    guests = fake_db.add_participants("GONE01", 4)
+    original = party_routes.generate_matches
+
+    def removed_meanwhile(participants, mode):
+        # The admin removes a guest after the lock read the participant list
+        del fake_db.tables["participants"][guests[0]["id"]]
+        return original(participants, mode)
+
+    monkeypatch.setattr(party_routes, "generate_matches", removed_meanwhile)
+    client.post("/api/party/GONE01/lock", json=ADMIN)
+
+    assert guests[0]["id"] not in fake_db.tables["participants"]
+    assert len(fake_db.tables["participants"]) == 3
+
+
+def test_lock_writes_matches_and_status_in_one_call(fake_db, sent_emails, client):
+    fake_db.add_party("ATOM01")
+    fake_db.add_participants("ATOM01", 300)
+
+    client.post("/api/party/ATOM01/lock", json=ADMIN)
+
+    writes = [call for call in fake_db.calls if call[1] != "select"]
+    assert writes == [("rpc", "lock_party_and_match")]
+
+
+def test_concurrent_lock_loses_cleanly(fake_db, sent_emails, client, monkeypatch):
+    from app.api.routes import party as party_routes
+
+    fake_db.add_party("RACE01")
+    fake_db.add_participants("RACE01", 4)
+    original = party_routes.generate_matches
+
+    def other_lock_wins(participants, mode):
+        # Another request locks the party after we read it as open
+        fake_db.tables["parties"]["RACE01"]["status"] = False
+        return original(participants, mode=mode)
+
+    monkeypatch.setattr(party_routes, "generate_matches", other_lock_wins)
+
+    assert client.post("/api/party/RACE01/lock", json=ADMIN).status_code == 400
+    assert sent_emails == []
+
+
+def test_lock_rejects_matches_when_participants_change(fake_db, sent_emails, client, monkeypatch):
+    from app.api.routes import party as party_routes
+
+    fake_db.add_party("RACE02")
+    fake_db.add_participants("RACE02", 4)
+    original = party_routes.generate_matches
+
+    def someone_joins(participants, mode):
+        fake_db.add_participants("RACE02", 1)
+        return original(participants, mode=mode)
+
+    monkeypatch.setattr(party_routes, "generate_matches", someone_joins)
+
+    assert client.post("/api/party/RACE02/lock", json=ADMIN).status_code == 409
+    assert fake_db.tables["parties"]["RACE02"]["status"] is True
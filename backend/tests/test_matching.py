@@ -0,0 +1,58 @@
+from collections import Counter
+
+import pytest
+
+from app.utils.matching import generate_matches, SINGLE_CYCLE, UNIFORM
+
+
+def make_participants(n):
+    return [{"id": f"p{i}", "name": f"Person {i}"} for i in range(n)]
+
+
+def as_mapping(updates):
+    return {u["id"]: u["giftee_id"] for u in updates}
+
+
+@pytest.mark.parametrize("mode", [UNIFORM, SINGLE_CYCLE])
+@pytest.mark.parametrize("n", [2, 3, 4, 5, 17, 1000])
+def test_matches_are_valid_derangements(mode, n):
+    participants = make_participants(n)
+    mapping = as_mapping(generate_matches(participants, mode=mode))
+
+    ids = {p["id"] for p in participants}
+    assert set(mapping) == ids
+    assert set(mapping.values()) == ids  # everyone receives exactly one gift
+    assert all(giver != giftee for giver, giftee in mapping.items())
+
+
+def test_single_cycle_visits_everyone():
+    participants = make_participants(50)
+    mapping = as_mapping(generate_matches(participants, mode=SINGLE_CYCLE))
+
+    start = participants[0]["id"]
+    current, steps = mapping[start], 1
+    while current != start:
+        current = mapping[current]
+        steps += 1
+    assert steps == len(participants)
+
+
+def test_uniform_mode_covers_all_derangements_evenly():
+    # 4 people have exactly 9 derangements; each should show up ~1/9 of the time
+    participants = make_participants(4)
+    trials = 18000
+    counts = Counter(
+        tuple(u["giftee_id"] for u in generate_matches(participants, mode=UNIFORM))
+        for _ in range(trials)
+    )
+
+    assert len(counts) == 9
+    expected = trials / 9
+    assert all(abs(c - expected) < expected * 0.1 for c in counts.values())
+
+
+def test_rejects_small_parties_and_unknown_modes():
+    with pytest.raises(ValueError):
+        generate_matches(make_participants(1))
+    with pytest.raises(ValueError):
+        generate_matches(make_participants(3), mode="random")
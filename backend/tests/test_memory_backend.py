@@ -0,0 +1,26 @@
+from app.core.config import settings
+from app.db.parties import party_cache
+from app.utils.email_queue import dispatcher
+
+
+def test_full_flow_on_memory_backend(sent_emails, client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_BACKEND", "memory")
+    party_cache.clear()
+
+    created = client.post("/api/party", json={
+        "id": "MEM001", "name": "Office Party", "currency": "USD", "event_date": "2025-12-20",
+        "event_time": "18:00:00", "organizer_name": "Host", "organizer_email": "host@example.com",
+    })
+    admin = {"passcode": created.json()["passcode"]}
+    for i in range(4):
+        client.post("/api/party/MEM001/participants", json={"name": f"Guest {i}", "email": f"guest{i}@example.com"})
+
+    assert len(client.get("/api/party/MEM001/participants").json()) == 5
+    assert client.post("/api/party/MEM001/lock", json=admin).status_code == 200
+    dispatcher.join()
+    assert len(sent_emails) == 6  # host email + 5 matches
+
+    # Deleting the party removes its participants too
+    client.request("DELETE", "/api/party/MEM001", json=admin)
+    assert client.get("/api/party/MEM001/participants").status_code == 404
+    assert client.post("/api/party/MEM001/participants/resend-mine", json={"email": "guest0@example.com"}).status_code == 404
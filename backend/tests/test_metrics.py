@@ -0,0 +1,95 @@
+import re
+
+import pytest
+
+from app.core.config import settings
+from app.utils import email
+from app.utils.metrics import Registry
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with `line_start`."""
+    match = re.search("^" + re.escape(line_start) + r" (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("job_seconds", "Job time.", ["kind"], buckets=[0.1, 1])
+    jobs = registry.counter("jobs_total", "Jobs.", ["kind"])
+    registry.gauge("queue_depth", "Waiting jobs.", read=lambda: 7)
+    for seconds in (0.05, 0.5, 0.5, 3):
+        latency.observe(seconds, "a")
+    jobs.inc('say "hi"')
+
+    text = registry.render()
+
+    assert 'job_seconds_bucket{kind="a",le="0.1"} 1' in text
+    assert 'job_seconds_bucket{kind="a",le="1"} 3' in text
+    assert 'job_seconds_bucket{kind="a",le="+Inf"} 4' in text
+    assert 'job_seconds_count{kind="a"} 4' in text and 'job_seconds_sum{kind="a"} 4.05' in text
+    assert 'jobs_total{kind="say \\"hi\\""} 1' in text
+    assert "# TYPE queue_depth gauge\nqueue_depth 7" in text
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "Again.")
+
+
+def test_metrics_cover_routes_and_db_calls(fake_db, client):
+    fake_db.add_party("MET001")
+    before = client.get("/metrics").text
+
+    for _ in range(3):
+        client.get("/api/party/MET001/participants")
+    client.get("/api/party/NOPE00")
+
+    after = client.get("/metrics")
+    assert after.headers["content-type"].startswith("text/plain")
+    route = 'http_request_duration_seconds_count{method="GET",route="/api/party/{party_id}/participants",status="200"}'
+    assert sample(after.text, route) - sample(before, route) == 3
+    missing = 'http_request_duration_seconds_count{method="GET",route="/api/party/{party_id}",status="404"}'
+    assert sample(after.text, missing) - sample(before, missing) == 1
+    calls = 'db_query_duration_seconds_count{table="participants",operation="select"}'
+    assert sample(after.text, calls) - sample(before, calls) == 3
+    assert "email_outbox_unfinished " in after.text and "live_watchers 0" in after.text
+
+
+def test_metrics_time_email_sends_and_failures(monkeypatch):
+    class BrokenTransport:
+        name = "memory"
+        quiet = True
+
+        def send(self, msg):
+            raise OSError("connection refused")
+
+    monkeypatch.setattr(settings, "EMAIL_TRANSPORT", "memory")
+    sent, failed = ("memory", "sent"), ("memory", "failed")
+    counts = email.EMAIL_SEND_SECONDS.count(*sent), email.EMAIL_SEND_SECONDS.count(*failed)
+
+    email.close_transport()
+    assert email.send_email("a@example.com", "Hi", "<p>Hi</p>") is True
+    monkeypatch.setattr(email, "_transport", BrokenTransport())
+    assert email.send_email("b@example.com", "Hi", "<p>Hi</p>") is False
+    monkeypatch.setattr(email, "_transport", None)
+
+    assert email.EMAIL_SEND_SECONDS.count(*sent) == counts[0] + 1
+    assert email.EMAIL_SEND_SECONDS.count(*failed) == counts[1] + 1
+
+
+def test_unhandled_errors_are_timed_as_500(fake_db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    def broken_join(**params):
+        raise RuntimeError("connection reset")
+
+    fake_db.add_party("MET002")
+    fake_db.functions["join_party"] = broken_join
+    client = TestClient(app, raise_server_exceptions=False)
+    route = 'http_request_duration_seconds_count{method="POST",route="/api/party/{party_id}/participants",status="500"}'
+    before = client.get("/metrics").text
+
+    response = client.post("/api/party/MET002/participants", json={"name": "Ann", "email": "ann@example.com"})
+
+    assert response.status_code == 500
+    assert sample(client.get("/metrics").text, route) - sample(before, route) == 1
+    assert "http_requests_in_progress 1" in client.get("/metrics").text  # Only the scrape itself
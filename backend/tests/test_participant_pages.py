@@ -0,0 +1,74 @@
+import json
+
+from app.core.config import settings
+
+ADMIN = {"passcode": "secret"}
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def test_pages_walk_the_whole_party_in_id_order(fake_db, client):
+    fake_db.add_party("PAGE01")
+    guests = fake_db.add_participants("PAGE01", 25)
+
+    seen, after, pages = [], None, 0
+    while True:
+        params = {"limit": 10} if after is None else {"limit": 10, "after": after}
+        response = client.get("/api/party/PAGE01/participants", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        pages += 1
+        after = response.headers.get("x-next-cursor")
+        if after is None:
+            break
+
+    assert pages == 3
+    assert [p["id"] for p in seen] == sorted(g["id"] for g in guests)
+    assert set(seen[0]) == {"id", "name"}
+
+
+def test_page_limits_are_validated(fake_db, client):
+    fake_db.add_party("PAGE02")
+
+    assert client.get("/api/party/PAGE02/participants", params={"limit": 0}).status_code == 422
+    assert client.get("/api/party/PAGE02/participants", params={"limit": 5000}).status_code == 422
+    assert client.get("/api/party/PAGE02/participants", params={"after": "not-an-id"}).status_code == 422
+
+
+def test_unpaged_list_is_unchanged(fake_db, client):
+    fake_db.add_party("PAGE03")
+    fake_db.add_participants("PAGE03", 5)
+
+    response = client.get("/api/party/PAGE03/participants")
+    assert len(response.json()) == 5
+    assert "x-next-cursor" not in response.headers
+
+
+def test_ndjson_streams_in_db_batches(fake_db, client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_BATCH_SIZE", 100)
+    fake_db.add_party("PAGE04")
+    guests = fake_db.add_participants("PAGE04", 250)
+    fake_db.calls.clear()
+
+    response = client.post("/api/party/PAGE04/participants/admin", json=ADMIN, headers=NDJSON)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["email"] for r in rows] == [g["email"] for g in sorted(guests, key=lambda g: g["id"])]
+    # Three pages, each its own bounded query
+    assert fake_db.calls.count(("participants", "select")) == 3
+
+
+def test_ndjson_honours_limit_and_cursor(fake_db, client):
+    fake_db.add_party("PAGE05")
+    guests = sorted(fake_db.add_participants("PAGE05", 8), key=lambda g: g["id"])
+
+    response = client.get("/api/party/PAGE05/participants", params={"limit": 3, "after": guests[1]["id"]}, headers=NDJSON)
+
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [g["id"] for g in guests[2:5]]
+
+
+def test_admin_pages_need_the_passcode(fake_db, client):
+    fake_db.add_party("PAGE06")
+
+    response = client.post("/api/party/PAGE06/participants/admin", params={"limit": 5}, json={"passcode": "wrong"}, headers=NDJSON)
+    assert response.status_code == 403
@@ -0,0 +1,43 @@
+import pytest
+
+ADMIN = {"passcode": "secret"}
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("DELETE", "/api/party/{id}", ADMIN),
+    ("PATCH", "/api/party/{id}", {**ADMIN, "name": "New"}),
+    ("POST", "/api/party/{id}/resend", ADMIN),
+    ("POST", "/api/party/{id}/participants/admin", ADMIN),
+    ("POST", "/api/party/{id}/participants/import", {**ADMIN, "participants": []}),
+    ("DELETE", "/api/party/{id}/participants/00000000-0000-0000-0000-000000000001", ADMIN),
+])
+def test_admin_routes_check_in_the_same_order(fake_db, client, method, path, body):
+    fake_db.add_party("ACC001")
+
+    missing = client.request(method, path.format(id="NOPE00"), json={**body, "passcode": "wrong"})
+    assert (missing.status_code, missing.json()["detail"]) == (404, "Party not found")
+
+    wrong = client.request(method, path.format(id="ACC001"), json={**body, "passcode": "wrong"})
+    assert (wrong.status_code, wrong.json()["detail"]) == (403, "Invalid passcode")
+
+    no_body = client.request(method, path.format(id="ACC001"))
+    assert no_body.status_code in (403, 422)
+
+
+def test_status_is_checked_after_the_passcode(fake_db, client):
+    fake_db.add_party("ACC002", status=False)
+
+    assert client.post("/api/party/ACC002/participants/import", json={"passcode": "wrong", "participants": []}).status_code == 403
+    locked = client.post("/api/party/ACC002/participants/import", json={**ADMIN, "participants": []})
+    assert (locked.status_code, locked.json()["detail"]) == (400, "Party is locked. No new participants allowed.")
+    assert client.post("/api/party/ACC002/lock", json=ADMIN).json()["detail"] == "Party is already locked"
+
+
+def test_party_is_read_once_per_request(fake_db, client):
+    fake_db.add_party("ACC003")
+    guest = fake_db.add_participants("ACC003", 3)[0]
+
+    response = client.request("DELETE", f"/api/party/ACC003/participants/{guest['id']}", json=ADMIN)
+
+    assert response.status_code == 204
+    assert fake_db.calls.count(("parties", "select")) == 1
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from app.db.parties import party_cache
+from app.utils.cache import TTLCache
+
+ADMIN = {"passcode": "secret"}
+
+
+def party_reads(db):
+    return db.calls.count(("parties", "select"))
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 1}
+
+
+def test_cache_entries_expire():
+    cache = TTLCache(maxsize=8, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_drops_a_set_that_raced_an_invalidate():
+    cache = TTLCache(maxsize=1, ttl=60)
+    before = cache.generation()
+    cache.invalidate("a")
+    cache.set("a", "stale", before)
+    assert cache.get("a") is None
+
+    # Still dropped once "a"'s invalidation record has been evicted by another key
+    cache.invalidate("b")
+    cache.set("a", "stale", before)
+    assert cache.get("a") is None
+
+    cache.set("a", "fresh", cache.generation())
+    assert cache.get("a") == "fresh"
+
+
+def test_cache_rejects_bad_config():
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0, ttl=60)
+
+
+def test_party_is_read_once(fake_db, client):
+    fake_db.add_party("READ01")
+
+    for _ in range(20):
+        assert client.get("/api/party/READ01").status_code == 200
+    client.get("/api/party/READ01/participants")
+
+    assert party_reads(fake_db) == 1
+    assert client.get("/stats").json()["party_cache"]["hits"] == 20
+
+
+def test_update_invalidates_cached_party(fake_db, client):
+    fake_db.add_party("UPD001")
+    assert client.get("/api/party/UPD001").json()["name"] == "Office Party"
+
+    client.patch("/api/party/UPD001", json={"passcode": "secret", "name": "Renamed"})
+
+    assert client.get("/api/party/UPD001").json()["name"] == "Renamed"
+
+
+def test_lock_and_delete_invalidate_cached_party(fake_db, sent_emails, client):
+    fake_db.add_party("LOCK09")
+    fake_db.add_participants("LOCK09", 3)
+    assert client.get("/api/party/LOCK09").json()["status"] is True
+
+    client.post("/api/party/LOCK09/lock", json=ADMIN)
+    assert client.get("/api/party/LOCK09").json()["status"] is False
+    join = client.post("/api/party/LOCK09/participants", json={"name": "Late", "email": "late@example.com"})
+    assert join.status_code == 400
+
+    client.request("DELETE", "/api/party/LOCK09", json=ADMIN)
+    assert "LOCK09" not in party_cache._entries
+    assert client.get("/api/party/LOCK09").status_code == 404
+
+
+def test_writes_check_status_past_a_stale_cache(fake_db, client):
+    fake_db.add_party("STALE1")
+    guest = fake_db.add_participants("STALE1", 3)[0]
+    assert client.get("/api/party/STALE1").json()["status"] is True
+
+    # Locked by another worker: this process still has the open party cached
+    fake_db.tables["parties"]["STALE1"]["status"] = False
+
+    removed = client.request("DELETE", f"/api/party/STALE1/participants/{guest['id']}", json=ADMIN)
+    imported = client.post("/api/party/STALE1/participants/import", json={**ADMIN, "participants": [{"name": "Late", "email": "late@example.com"}]})
+
+    assert removed.status_code == 400 and imported.status_code == 400
+    assert len(fake_db.tables["participants"]) == 3
@@ -0,0 +1,35 @@
+import pytest
+
+ADMIN = {"passcode": "secret"}
+
+
+def test_server_timing_reports_db_calls(fake_db, client):
+    fake_db.add_party("TIME01")
+
+    response = client.get("/api/party/TIME01/participants")
+
+    assert response.headers["server-timing"].startswith('db;desc="2 queries";dur=')
+
+
+@pytest.mark.query_budget(1)
+def test_join_within_budget(fake_db, client):
+    fake_db.add_party("BUDG01")
+
+    for i in range(3):
+        client.post("/api/party/BUDG01/participants", json={"name": f"Guest {i}", "email": f"guest{i}@example.com"})
+
+
+@pytest.mark.query_budget(3)
+def test_lock_within_budget(fake_db, sent_emails, client):
+    fake_db.add_party("BUDG02")
+    fake_db.add_participants("BUDG02", 500)
+
+    assert client.post("/api/party/BUDG02/lock", json=ADMIN).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_budget_overrun_fails_the_test(fake_db, client):
+    fake_db.add_party("BUDG03")
+
+    with pytest.raises(pytest.fail.Exception, match="made 2 DB calls"):
+        client.get("/api/party/BUDG03/participants")
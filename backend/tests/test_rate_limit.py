@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.utils import email
+from app.utils.email_queue import EmailDispatcher
+from app.utils.outbox import MemoryOutbox
+from app.utils.rate_limit import TokenBucket
+from benchmarks.smtp_server import LocalSMTPServer
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        bucket.acquire()
+    burst = time.perf_counter() - start
+    for _ in range(10):
+        bucket.acquire()
+    total = time.perf_counter() - start
+
+    assert burst < 0.05
+    assert total >= 10 / 50 * 0.9
+
+
+@pytest.fixture
+def local_smtp(monkeypatch):
+    with LocalSMTPServer(handshake_delay=0.005) as server:
+        monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+        monkeypatch.setattr(settings, "SMTP_PORT", server.port)
+        monkeypatch.setattr(settings, "SMTP_USE_TLS", False)
+        monkeypatch.setattr(settings, "EMAIL_SENDER", "santa@example.com")
+        monkeypatch.setattr(settings, "EMAIL_PASSWORD", "password")
+        email.close_transport()
+        yield server
+        email.close_transport()
+
+
+def test_parallel_workers_share_bounded_pool_and_rate(monkeypatch, local_smtp):
+    monkeypatch.setattr(settings, "SMTP_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "SMTP_RATE_PER_MINUTE", 600)  # 10 per second
+    monkeypatch.setattr(settings, "SMTP_BURST", 5)
+    queue = EmailDispatcher(outbox=MemoryOutbox(), workers=4)
+
+    start = time.perf_counter()
+    queue.enqueue_many("RATE01", [(f"guest{i}@example.com", "Hi", "<p>Hi</p>") for i in range(15)])
+    queue.join()
+    elapsed = time.perf_counter() - start
+    queue.stop()
+
+    assert local_smtp.messages == 15
+    assert local_smtp.connections <= 2
+    assert elapsed >= (15 - 5) / 10 * 0.9
@@ -0,0 +1,34 @@
+ADMIN = {"passcode": "secret"}
+
+
+def locked_party(fake_db, client, party_id):
+    fake_db.add_party(party_id)
+    guests = fake_db.add_participants(party_id, 4)
+    client.post(f"/api/party/{party_id}/lock", json=ADMIN)
+    fake_db.calls.clear()
+    return guests
+
+
+def test_resend_mine_uses_one_db_call(fake_db, sent_emails, client):
+    guests = locked_party(fake_db, client, "MINE01")
+    sent_emails.clear()
+
+    response = client.post("/api/party/MINE01/participants/resend-mine", json={"email": guests[0]["email"]})
+
+    assert response.status_code == 200
+    assert fake_db.calls == [("participants", "select")]
+    assert sent_emails == [(guests[0]["email"], "Your Secret Santa Match for Office Party!")]
+
+
+def test_resend_mine_errors(fake_db, sent_emails, client):
+    locked_party(fake_db, client, "MINE02")
+    fake_db.add_party("OPEN01")
+    fake_db.add_participants("OPEN01", 2)
+
+    unknown = client.post("/api/party/MINE02/participants/resend-mine", json={"email": "nobody@example.com"})
+    still_open = client.post("/api/party/OPEN01/participants/resend-mine", json={"email": "guest0@example.com"})
+    missing = client.post("/api/party/NOPE00/participants/resend-mine", json={"email": "guest0@example.com"})
+
+    assert unknown.status_code == 404 and unknown.json()["detail"] == "Email not found in this party."
+    assert still_open.status_code == 400
+    assert missing.status_code == 404 and missing.json()["detail"] == "Party not found"
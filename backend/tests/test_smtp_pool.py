@@ -0,0 +1,41 @@
+import threading
+from email.mime.text import MIMEText
+
+from app.utils.smtp_pool import SMTPPool
+from benchmarks.smtp_server import LocalSMTPServer
+
+
+def make_message(i):
+    msg = MIMEText(f"Message {i}")
+    msg["From"] = "santa@example.com"
+    msg["To"] = f"guest{i}@example.com"
+    msg["Subject"] = "Test"
+    return msg
+
+
+def test_pool_reuses_sessions():
+    with LocalSMTPServer() as server:
+        pool = SMTPPool("127.0.0.1", server.port, "santa@example.com", "pw", size=2, use_tls=False)
+        threads = [
+            threading.Thread(target=lambda start=start: [pool.send(make_message(i)) for i in range(start, start + 10)])
+            for start in (0, 10, 20)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        pool.close()
+
+        assert server.messages == 30
+        assert server.connections <= 2
+
+
+def test_pool_reconnects_when_server_drops_session():
+    with LocalSMTPServer(max_messages_per_session=3) as server:
+        pool = SMTPPool("127.0.0.1", server.port, "santa@example.com", "pw", size=1, use_tls=False)
+        for i in range(10):
+            pool.send(make_message(i))
+        pool.close()
+
+        assert server.messages == 10
+        assert server.connections == 4
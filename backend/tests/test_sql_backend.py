@@ -0,0 +1,217 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.db.parties import party_cache
+from app.db.participants import participant_list_etags
+from app.db.repository import close_db
+from app.utils.email_queue import dispatcher
+
+PARTY = {
+    "id": "SQL001", "name": "Office Party", "currency": "USD", "event_date": "2025-12-20",
+    "event_time": "18:00:00", "organizer_name": "Host", "organizer_email": "host@example.com",
+}
+
+
+@pytest.fixture
+def sql_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_BACKEND", "sql")
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'santa.sqlite3'}")
+    party_cache.clear()
+    participant_list_etags.clear()
+    yield
+    close_db()
+
+
+def create_party_with_guests(client, guests):
+    admin = {"passcode": client.post("/api/party", json=PARTY).json()["passcode"]}
+    for i in range(guests):
+        client.post("/api/party/SQL001/participants", json={"name": f"Guest {i}", "email": f"guest{i}@example.com"})
+    return admin
+
+
+def test_party_flow_on_sqlite(sql_db, sent_emails, client):
+    admin = create_party_with_guests(client, 4)
+
+    party = client.get("/api/party/SQL001").json()
+    assert party["status"] is True and party["event_date"] == "2025-12-20"
+    assert len(client.get("/api/party/SQL001/participants").json()) == 5
+
+    assert client.post("/api/party/SQL001/lock", json={"passcode": "wrong"}).status_code == 403
+    assert client.post("/api/party/SQL001/lock", json=admin).status_code == 200
+    assert client.post("/api/party/SQL001/lock", json=admin).status_code == 400
+    dispatcher.join()
+    sent_emails.clear()
+
+    mine = client.post("/api/party/SQL001/participants/resend-mine", json={"email": "guest2@example.com"})
+    assert mine.status_code == 200
+    assert mine.headers["server-timing"].startswith('db;desc="1 queries"')
+    assert [to for to, _ in sent_emails] == ["guest2@example.com"]
+
+
+def test_lock_on_sqlite_stores_a_derangement(sql_db, sent_emails, client):
+    admin = create_party_with_guests(client, 30)
+
+    client.post("/api/party/SQL001/lock", json=admin)
+    dispatcher.join()
+
+    import sqlite3
+    conn = sqlite3.connect(settings.DATABASE_URL[len("sqlite:///"):])
+    rows = conn.execute("SELECT id, giftee_id FROM participants").fetchall()
+    assert all(giftee and giftee != pid for pid, giftee in rows)
+    assert sorted(g for _, g in rows) == sorted(pid for pid, _ in rows)
+
+
+def test_delete_cascades_on_sqlite(sql_db, client):
+    admin = create_party_with_guests(client, 2)
+
+    client.request("DELETE", "/api/party/SQL001", json=admin)
+
+    assert client.get("/api/party/SQL001").status_code == 404
+    assert client.post("/api/party/SQL001/participants/resend-mine", json={"email": "guest0@example.com"}).status_code == 404
+
+
+def test_unique_email_on_sqlite(sql_db, client):
+    create_party_with_guests(client, 1)
+
+    duplicate = client.post("/api/party/SQL001/participants", json={"name": "Again", "email": "guest0@example.com"})
+
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "This email is already registered for this party."
+
+
+def test_import_on_sqlite_skips_registered_emails(sql_db, client):
+    admin = create_party_with_guests(client, 1)
+
+    body = client.post("/api/party/SQL001/participants/import", json={**admin, "participants": [
+        {"name": "Guest", "email": "guest0@example.com"},
+        {"name": "New", "email": "new@example.com"},
+    ]}).json()
+
+    assert body["added"] == 1
+    assert [r["status"] for r in body["rows"]] == ["exists", "added"]
+    assert len(client.get("/api/party/SQL001/participants").json()) == 3
+
+
+def test_participant_pages_on_sqlite(sql_db, client):
+    create_party_with_guests(client, 6)
+
+    first = client.get("/api/party/SQL001/participants", params={"limit": 4})
+    rest = client.get("/api/party/SQL001/participants", params={"limit": 4, "after": first.headers["x-next-cursor"]})
+
+    ids = [p["id"] for p in first.json() + rest.json()]
+    assert len(ids) == 7 and ids == sorted(ids)
+    assert "x-next-cursor" not in rest.headers
+
+
+def test_only_data_errors_become_api_errors():
+    from app.db.sql import PostgresDialect
+
+    class PgError(Exception):
+        def __init__(self, sqlstate):
+            super().__init__(sqlstate)
+            self.sqlstate = sqlstate
+
+    dialect = PostgresDialect.__new__(PostgresDialect)  # No psycopg needed to map errors
+
+    assert dialect.api_error(PgError("23505")).code == "23505"
+    assert dialect.api_error(PgError("40001")).code == "40001"
+    assert dialect.api_error(PgError("08006")) is None  # Connection failure
+    assert dialect.api_error(PgError("57P01")) is None  # Admin shutdown
+
+
+def test_pool_drops_broken_connections_after_api_errors():
+    from postgrest.exceptions import APIError
+    from app.db.sql import ConnectionPool
+
+    class Connection:
+        broken = False
+
+        def close(self):
+            self.closed = True
+
+    opened = []
+    pool = ConnectionPool(lambda: opened.append(Connection()) or opened[-1], size=1)
+
+    for broken in (False, True):
+        with pytest.raises(APIError):
+            with pool.connection() as conn:
+                conn.broken = broken
+                raise APIError({"code": "23505", "message": "duplicate"})
+
+    with pool.connection() as conn:
+        pass
+
+    # Reused after the healthy error, replaced after the broken one
+    assert len(opened) == 2 and conn is opened[1]
+    assert getattr(opened[0], "closed", False)
+
+
+POSTGRES_URL = os.getenv("TEST_DATABASE_URL", "")
+
+
+@pytest.fixture
+def postgres_db():
+    """SQLClient on the Postgres database in TEST_DATABASE_URL, with one open party."""
+    if not POSTGRES_URL.startswith(("postgres://", "postgresql://")):
+        pytest.skip("Set TEST_DATABASE_URL=postgresql://... to run the Postgres tests")
+    pytest.importorskip("psycopg")
+    from app.db.sql import SQLClient
+
+    db = SQLClient.from_url(POSTGRES_URL, pool_size=2)
+    party_id = f"PG{uuid.uuid4().hex[:6].upper()}"
+    asyncio.run(db.table("parties").insert({**PARTY, "id": party_id}).execute())
+    yield db, party_id
+    asyncio.run(db.table("parties").delete().eq("id", party_id).execute())
+    db.close()
+
+
+def rpc(db, name, **params):
+    return asyncio.run(db.rpc(name, params).execute()).data
+
+
+def test_join_and_import_on_postgres(postgres_db):
+    from postgrest.exceptions import APIError
+
+    db, party_id = postgres_db
+
+    joined = rpc(db, "join_party", p_party_id=party_id, p_name="Ann", p_email="ann@example.com")
+    assert joined["party_id"] == party_id and uuid.UUID(joined["id"])
+
+    with pytest.raises(APIError) as duplicate:
+        rpc(db, "join_party", p_party_id=party_id, p_name="Ann", p_email="ann@example.com")
+    with pytest.raises(APIError) as missing:
+        rpc(db, "join_party", p_party_id="NOPE00", p_name="Ann", p_email="ann@example.com")
+
+    assert (duplicate.value.code, missing.value.code) == ("23505", "P0002")
+
+    imported = rpc(db, "import_participants", p_party_id=party_id, p_participants=[
+        {"name": "Ann", "email": "ann@example.com"},
+        {"name": "Ben", "email": "ben@example.com"},
+    ])
+    assert [p["email"] for p in imported] == ["ben@example.com"]
+
+
+def test_lock_party_and_match_on_postgres(postgres_db):
+    from postgrest.exceptions import APIError
+
+    db, party_id = postgres_db
+    ids = [rpc(db, "join_party", p_party_id=party_id, p_name=f"Guest {i}", p_email=f"guest{i}@example.com")["id"] for i in range(3)]
+    passcode = asyncio.run(db.table("parties").select("passcode").eq("id", party_id).execute()).data[0]["passcode"]
+    assignments = [{"id": giver, "giftee_id": ids[(i + 1) % 3]} for i, giver in enumerate(ids)]
+
+    def lock(code, given):
+        with pytest.raises(APIError) as error:
+            rpc(db, "lock_party_and_match", p_party_id=party_id, p_passcode=code, p_assignments=given)
+        return error.value.code
+
+    assert lock(str(uuid.uuid4()), assignments) == "28P01"
+    assert lock(passcode, assignments[:2]) == "40001"
+
+    rpc(db, "lock_party_and_match", p_party_id=party_id, p_passcode=passcode, p_assignments=assignments)
+    rows = asyncio.run(db.table("participants").select("id, giftee_id").eq("party_id", party_id).execute()).data
+    assert {r["id"]: r["giftee_id"] for r in rows} == {a["id"]: a["giftee_id"] for a in assignments}
+    assert lock(passcode, assignments) == "55000"
@@ -0,0 +1,24 @@
+import asyncio
+
+
+def test_async_client_is_created_once_under_concurrent_first_requests(monkeypatch):
+    from app.db import supabase as supabase_module
+
+    created = []
+
+    async def slow_acreate_client(url, key, options=None):
+        created.append(options)
+        await asyncio.sleep(0.01)  # Other first requests arrive meanwhile
+        return object()
+
+    monkeypatch.setattr(supabase_module, "acreate_client", slow_acreate_client)
+    monkeypatch.setattr(supabase_module, "_async_supabase", None)
+    monkeypatch.setattr(supabase_module, "_async_supabase_lock", asyncio.Lock())  # Binds to this test's loop
+
+    async def scenario():
+        return await asyncio.gather(*(supabase_module.get_async_supabase() for _ in range(10)))
+
+    clients = asyncio.run(scenario())
+
+    assert len(created) == 1
+    assert all(client is clients[0] for client in clients)
@@ -0,0 +1,53 @@
+import pytest
+
+from app.utils.email import MATCH_EMAIL_HTML, MATCH_TEMPLATE, prepare_match_email
+from app.utils.templates import Template
+
+PARTY = {
+    "name": "Office Party",
+    "event_date": "2025-12-20",
+    "event_time": "18:00:00+00:00",
+    "budget": 25,
+    "currency": "USD",
+    "description": "Bring snacks",
+}
+
+
+def test_template_matches_str_format():
+    source = "{{literal}} Hello {name}, you owe {amount:.2f} {currency}. Bye {name}!"
+    values = {"name": "Ana", "amount": 12.5, "currency": "EUR"}
+
+    assert Template(source).render(**values) == source.format(**values)
+    assert Template(source).partial(currency="EUR").render(name="Ana", amount=12.5) == source.format(**values)
+
+
+def test_partial_only_leaves_recipient_slots():
+    party_template = MATCH_TEMPLATE.partial(
+        party_name="x", party_date="x", party_time="x", party_budget=1, party_currency="x", party_description="x"
+    )
+
+    assert party_template.fields == ["participant_name", "giftee_name", "giftee_email"]
+
+
+def test_prepared_match_email_matches_full_render():
+    build = prepare_match_email(PARTY)
+    to_email, subject, html = build({"name": "Ana", "email": "ana@example.com"}, "Ben", "ben@example.com")
+
+    expected = MATCH_EMAIL_HTML.format(
+        participant_name="Ana",
+        giftee_name="Ben",
+        giftee_email="ben@example.com",
+        party_name="Office Party",
+        party_date="2025-12-20",
+        party_time="18:00",
+        party_budget=25,
+        party_currency="USD",
+        party_description="Bring snacks",
+    )
+    assert (to_email, subject) == ("ana@example.com", "Your Secret Santa Match for Office Party!")
+    assert html == expected
+
+
+def test_missing_slot_raises():
+    with pytest.raises(KeyError):
+        Template("Hi {name}").render()
@@ -0,0 +1,52 @@
+import mailbox
+
+import pytest
+
+from app.core.config import settings
+from app.utils import email
+
+
+@pytest.fixture
+def use_transport(monkeypatch):
+    def select(name, **options):
+        monkeypatch.setattr(settings, "EMAIL_TRANSPORT", name)
+        for key, value in options.items():
+            monkeypatch.setattr(settings, key, value)
+        email.close_transport()
+        return email.get_transport()
+
+    yield select
+    email.close_transport()
+
+
+def test_memory_transport_captures_messages(use_transport, monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_SENDER", None)  # no SMTP credentials needed
+    transport = use_transport("memory")
+
+    assert email.send_email("ana@example.com", "Your match", "<p>Ben</p>")
+
+    [msg] = transport.messages
+    assert msg["To"] == "ana@example.com"
+    assert msg["Subject"] == "Your match"
+    assert "<p>Ben</p>" in msg.as_string()
+
+
+def test_maildir_transport_writes_files(use_transport, tmp_path):
+    use_transport("maildir", EMAIL_MAILDIR=str(tmp_path / "mail"))
+
+    email.send_email("ana@example.com", "One", "<p>1</p>")
+    email.send_email("ben@example.com", "Two", "<p>2</p>")
+
+    subjects = sorted(msg["Subject"] for msg in mailbox.Maildir(str(tmp_path / "mail")))
+    assert subjects == ["One", "Two"]
+
+
+def test_null_transport_accepts_everything(use_transport):
+    use_transport("null")
+
+    assert email.send_email("ana@example.com", "Dropped", "<p>bye</p>")
+
+
+def test_unknown_transport_is_rejected(use_transport):
+    with pytest.raises(ValueError):
+        use_transport("pigeon")
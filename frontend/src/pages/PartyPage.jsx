@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import { Background } from '../components/Background'
 import { Footer } from '../components/Footer'
-import { getParty, getParticipants, getParticipantsAdmin, joinParty, removeParticipant, updateParticipant, lockParty, deleteParty, updateParty, resendAllEmails } from '../services/api'
+import { getParty, getParticipants, getParticipantsAdmin, getDashboard, joinParty, removeParticipant, updateParticipant, lockParty, deleteParty, updateParty, resendAllEmails } from '../services/api'
 import { motion } from 'framer-motion'
 
 export default function PartyPage() {
@@ -38,14 +38,14 @@ export default function PartyPage() {
 
   async function loadData() {
     try {
-      const partyData = await getParty(id)
-      setParty(partyData)
-      
-      // If we already have admin access, fetch full details
+      // If we already have admin access, fetch full details in one request
       if (isAdmin) {
-        const pList = await getParticipantsAdmin(id, passcode)
-        setParticipants(pList)
+        const dashboard = await getDashboard(id, passcode)
+        setParty(dashboard.party)
+        setParticipants(dashboard.participants)
       } else {
+        const partyData = await getParty(id)
+        setParty(partyData)
         const pList = await getParticipants(id)
         setParticipants(pList)
       }
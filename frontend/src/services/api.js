@@ -32,6 +32,16 @@ export async function getParticipantsAdmin(partyId, passcode) {
   return response.json()
 }
 
+export async function getDashboard(partyId, passcode) {
+  const response = await fetch(`${API_URL}/party/${partyId}/dashboard`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ passcode }),
+  })
+  if (!response.ok) throw await response.json()
+  return response.json()
+}
+
 export async function joinParty(partyId, participantData) {
   const response = await fetch(`${API_URL}/party/${partyId}/participants`, {
     method: 'POST',